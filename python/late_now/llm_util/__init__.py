@@ -3,6 +3,7 @@ from enum import Enum, auto
 
 from late_now.llm_util import _groq_backend, _local_backend, _openai_backend
 from ._xml_util import xml_prompt
+from ._response_cache import RESPONSE_CACHE, cache_key
 from late_now.plan_broadcast._characters import WALTER_SPANKS_BIO
 
 UNKNOWN_RESPONSE = "|UNK|"
@@ -30,44 +31,177 @@ ACTIVE_GENERAL_TYPE = LLMBackendType.GROQ
 ACTIVE_GENERAL_BACKEND = BACKEND_TYPE_TO_BACKEND[ACTIVE_GENERAL_TYPE]
 
 
-def prompt_walter(prompt: str, temperature=1.0):
+def prompt_walter(prompt: str, temperature=1.0, *, seed=None, use_cache=True):
     return _prompt_backend(
         ACTIVE_HUMOR_BACKEND,
         prompt,
         system_prompt=_walter_system_prompt(),
         temperature=temperature,
+        seed=seed,
+        use_cache=use_cache,
     )
 
 
 def prompt_screenwriter(
-    prompt: str, *, screenwriter_system_prompt: str, temperature=0.9
+    prompt: str,
+    *,
+    screenwriter_system_prompt: str,
+    temperature=0.9,
+    seed=None,
+    use_cache=True,
 ):
     return _prompt_backend(
         ACTIVE_GENERAL_BACKEND,
         prompt,
         system_prompt=screenwriter_system_prompt,
         temperature=temperature,
+        seed=seed,
+        use_cache=use_cache,
     )
 
 
-def prompt_general_llm(prompt: str, system_prompt: str = "", temperature=1.0):
+def prompt_general_llm(
+    prompt: str,
+    system_prompt: str = "",
+    temperature=1.0,
+    *,
+    seed=None,
+    use_cache=True,
+):
     return _prompt_backend(
         ACTIVE_GENERAL_BACKEND,
         prompt,
         system_prompt=system_prompt,
         temperature=temperature,
+        seed=seed,
+        use_cache=use_cache,
+    )
+
+
+async def aprompt_walter(prompt: str, temperature=1.0, *, seed=None, use_cache=True):
+    return await _aprompt_backend(
+        ACTIVE_HUMOR_BACKEND,
+        prompt,
+        system_prompt=_walter_system_prompt(),
+        temperature=temperature,
+        seed=seed,
+        use_cache=use_cache,
+    )
+
+
+async def aprompt_screenwriter(
+    prompt: str,
+    *,
+    screenwriter_system_prompt: str,
+    temperature=0.9,
+    seed=None,
+    use_cache=True,
+):
+    return await _aprompt_backend(
+        ACTIVE_GENERAL_BACKEND,
+        prompt,
+        system_prompt=screenwriter_system_prompt,
+        temperature=temperature,
+        seed=seed,
+        use_cache=use_cache,
+    )
+
+
+async def aprompt_general_llm(
+    prompt: str,
+    system_prompt: str = "",
+    temperature=1.0,
+    *,
+    seed=None,
+    use_cache=True,
+):
+    return await _aprompt_backend(
+        ACTIVE_GENERAL_BACKEND,
+        prompt,
+        system_prompt=system_prompt,
+        temperature=temperature,
+        seed=seed,
+        use_cache=use_cache,
     )
 
 
-def _prompt_backend(backend, prompt: str, system_prompt: str, temperature: float):
-    json_response = backend.completion(
-        prompt, system_prompt=system_prompt, temperature=temperature
+async def aclose_llm_sessions():
+    """Closes pooled async HTTP sessions bound to the running event loop."""
+    for backend in BACKEND_TYPE_TO_BACKEND.values():
+        await backend.aclose()
+
+
+def response_cache_stats() -> dict[str, int]:
+    return RESPONSE_CACHE.stats()
+
+
+def release_local_model():
+    """Evicts the resident local LLM, e.g. before loading TTS or diffusion models."""
+    _local_backend.release()
+
+
+def _backend_name(backend) -> str:
+    for backend_type, candidate in BACKEND_TYPE_TO_BACKEND.items():
+        if candidate is backend:
+            return backend_type.name
+    return backend.__name__
+
+
+def _cache_key(backend, prompt, system_prompt, temperature, seed) -> str:
+    return cache_key(
+        backend=_backend_name(backend),
+        model=backend.MODEL_NAME,
+        system_prompt=system_prompt,
+        prompt=prompt,
+        temperature=temperature,
+        seed=seed,
     )
+
+
+def _response_content(json_response: dict) -> str:
     print(json_response)
     content = json_response["choices"][0]["message"]["content"]
     return content.removesuffix("<|eot_id|>")
 
 
+def _prompt_backend(
+    backend,
+    prompt: str,
+    system_prompt: str,
+    temperature: float,
+    seed: int | None = None,
+    use_cache: bool = True,
+):
+    key = _cache_key(backend, prompt, system_prompt, temperature, seed)
+    json_response = RESPONSE_CACHE.get(key) if use_cache else None
+    if json_response is None:
+        json_response = backend.completion(
+            prompt, system_prompt=system_prompt, temperature=temperature, seed=seed
+        )
+        if use_cache and "choices" in json_response:
+            RESPONSE_CACHE.put(key, json_response)
+    return _response_content(json_response)
+
+
+async def _aprompt_backend(
+    backend,
+    prompt: str,
+    system_prompt: str,
+    temperature: float,
+    seed: int | None = None,
+    use_cache: bool = True,
+):
+    key = _cache_key(backend, prompt, system_prompt, temperature, seed)
+    json_response = RESPONSE_CACHE.get(key) if use_cache else None
+    if json_response is None:
+        json_response = await backend.acompletion(
+            prompt, system_prompt=system_prompt, temperature=temperature, seed=seed
+        )
+        if use_cache and "choices" in json_response:
+            RESPONSE_CACHE.put(key, json_response)
+    return _response_content(json_response)
+
+
 def try_parse_xml_llm_response(response: str):
     # trim up to the first '<' character and the last '>' character
     if "<" not in response or ">" not in response:
@@ -1,27 +1,49 @@
-import time
-
-import requests
 import os
 
+from late_now.llm_util._http import ChatCompletionsClient
+from late_now.llm_util._rate_limit import RateLimiter
+
 _GROQ_APIKEY = os.environ.get("GROQ_API_KEY")
+_GROQ_API_BASE = os.environ.get("GROQ_API_BASE", "https://api.groq.com/openai/v1")
+MODEL_NAME = "llama-3.3-70b-versatile"
+
+_CLIENT = ChatCompletionsClient(
+    base_url=_GROQ_API_BASE,
+    api_key=_GROQ_APIKEY,
+    max_concurrency=int(os.environ.get("GROQ_MAX_CONCURRENCY", "4")),
+    rate_limiter=RateLimiter(
+        requests_per_minute=float(os.environ.get("GROQ_REQUESTS_PER_MINUTE", "30")),
+        tokens_per_minute=float(os.environ.get("GROQ_TOKENS_PER_MINUTE", "6000")),
+    ),
+)
+
+
+def _request_body(prompt: str, system_prompt: str, temperature: float, seed) -> dict:
+    body = {
+        "model": MODEL_NAME,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        "max_tokens": 4096,
+        "temperature": temperature,
+    }
+    if seed is not None:
+        body["seed"] = seed
+    return body
+
+
+def completion(
+    prompt: str, system_prompt: str, temperature: float, seed: int | None = None
+) -> dict:
+    return _CLIENT.post(_request_body(prompt, system_prompt, temperature, seed))
+
+
+async def acompletion(
+    prompt: str, system_prompt: str, temperature: float, seed: int | None = None
+) -> dict:
+    return await _CLIENT.apost(_request_body(prompt, system_prompt, temperature, seed))
 
 
-def completion(prompt: str, system_prompt: str, temperature: float) -> str:
-    time.sleep(5.0)
-    result = requests.post(
-        "https://api.groq.com/openai/v1/chat/completions",
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {_GROQ_APIKEY}",
-        },
-        json={
-            "model": "llama-3.3-70b-versatile",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt},
-            ],
-            "max_tokens": 4096,
-            "temperature": temperature,
-        },
-    )
-    return result.json()
+async def aclose():
+    await _CLIENT.aclose()
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import threading
+import time
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from late_now.llm_util._rate_limit import (
+    RateLimiter,
+    backoff_delay_sec,
+    estimate_tokens,
+)
+
+_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class ChatCompletionsClient:
+    """Pooled sync/async client for an OpenAI-compatible chat completions API.
+
+    Sync calls share one `requests.Session`; async calls share one
+    `aiohttp.ClientSession` per event loop, bounded to `max_concurrency`
+    requests in flight.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        api_key: str | None,
+        max_concurrency: int = 4,
+        timeout_sec: float = 120.0,
+        max_retries: int = 5,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
+        self.max_concurrency = max_concurrency
+        self.timeout_sec = timeout_sec
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        }
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._async_sessions = {}
+
+    def _sync_session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_maxsize=self.max_concurrency)
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+                self._session.headers.update(self._headers)
+            return self._session
+
+    def _async_session(self) -> tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        for stale_loop in [
+            other for other in self._async_sessions if other.is_closed()
+        ]:
+            del self._async_sessions[stale_loop]
+        if loop not in self._async_sessions or self._async_sessions[loop][0].closed:
+            session = aiohttp.ClientSession(
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout_sec),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            )
+            self._async_sessions[loop] = (
+                session,
+                asyncio.Semaphore(self.max_concurrency),
+            )
+        return self._async_sessions[loop]
+
+    def _estimate_tokens(self, body: dict) -> int:
+        return estimate_tokens(*(message["content"] for message in body["messages"]))
+
+    def _record_usage(self, estimated_tokens: int, json_response: dict):
+        if self.rate_limiter and (usage := json_response.get("usage")):
+            self.rate_limiter.record_usage(estimated_tokens, usage["total_tokens"])
+
+    def _on_retry(self, attempt: int, reason: str, retry_after: str | None):
+        delay_sec = backoff_delay_sec(attempt, retry_after)
+        print(f"Request to {self.url} failed ({reason}), retrying in {delay_sec:.1f}s")
+        if self.rate_limiter:
+            self.rate_limiter.block_for(delay_sec)
+        return delay_sec
+
+    def post(self, body: dict) -> dict:
+        estimated_tokens = self._estimate_tokens(body)
+        session = self._sync_session()
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire(estimated_tokens)
+            try:
+                with self._semaphore:
+                    result = session.post(self.url, json=body, timeout=self.timeout_sec)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay_sec = self._on_retry(attempt, str(e), None)
+            else:
+                if (
+                    result.status_code not in _RETRY_STATUS_CODES
+                    or attempt == self.max_retries
+                ):
+                    break
+                delay_sec = self._on_retry(
+                    attempt, str(result.status_code), result.headers.get("Retry-After")
+                )
+            if not self.rate_limiter:
+                time.sleep(delay_sec)
+
+        json_response = result.json()
+        self._record_usage(estimated_tokens, json_response)
+        return json_response
+
+    async def apost(self, body: dict) -> dict:
+        estimated_tokens = self._estimate_tokens(body)
+        session, semaphore = self._async_session()
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.aacquire(estimated_tokens)
+            try:
+                async with semaphore, session.post(self.url, json=body) as result:
+                    status = result.status
+                    retry_after = result.headers.get("Retry-After")
+                    response_text = await result.text()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay_sec = self._on_retry(attempt, repr(e), None)
+            else:
+                if status not in _RETRY_STATUS_CODES or attempt == self.max_retries:
+                    break
+                delay_sec = self._on_retry(attempt, str(status), retry_after)
+            if not self.rate_limiter:
+                await asyncio.sleep(delay_sec)
+
+        json_response = json.loads(response_text)
+        self._record_usage(estimated_tokens, json_response)
+        return json_response
+
+    async def aclose(self):
+        """Closes the pooled async session bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop in self._async_sessions:
+            session, _ = self._async_sessions.pop(loop)
+            await session.close()
@@ -1,18 +1,108 @@
-# Use a pipeline as a high-level helper
-from transformers import pipeline
+import asyncio
 import gc
-import torch
+import os
+import threading
+import time
+
+MODEL_NAME = "PrunaAI/IlyaGusev-gemma-2-9b-it-abliterated-bnb-4bit-smashed"
+
+# Seconds the pipeline may sit unused before it is evicted from memory.
+# A value <= 0 keeps it resident until `release()` is called.
+IDLE_TIMEOUT_SEC = float(os.environ.get("LATE_NOW_LOCAL_LLM_IDLE_TIMEOUT_SEC", "300"))
 
 
 def _load_model():
+    # Imported lazily so llm_util works without the local model stack installed.
+    # Use a pipeline as a high-level helper
+    from transformers import pipeline
+
     pipe = pipeline(
         "text-generation",
-        model="PrunaAI/IlyaGusev-gemma-2-9b-it-abliterated-bnb-4bit-smashed",
+        model=MODEL_NAME,
         device_map="auto",
     )
     return pipe
 
 
+class _ResidentModel:
+    def __init__(self, load_fn, idle_timeout_sec: float):
+        self._load_fn = load_fn
+        self._idle_timeout_sec = idle_timeout_sec
+        self._lock = threading.RLock()
+        self._model = None
+        self._last_used = 0.0
+        self._eviction_timer = None
+
+    def set_idle_timeout(self, idle_timeout_sec: float):
+        with self._lock:
+            self._idle_timeout_sec = idle_timeout_sec
+            self._schedule_eviction()
+
+    def run(self, fn):
+        """Calls `fn(model)` with the resident model, loading it if needed."""
+        with self._lock:
+            if self._model is None:
+                print(f"Loading local model {MODEL_NAME}...")
+                self._model = self._load_fn()
+            try:
+                return fn(self._model)
+            finally:
+                self._last_used = time.monotonic()
+                self._schedule_eviction()
+
+    def release(self):
+        with self._lock:
+            self._cancel_eviction()
+            if self._model is None:
+                return
+            print(f"Releasing local model {MODEL_NAME}")
+            self._model = None
+        import torch
+
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def _cancel_eviction(self):
+        if self._eviction_timer is not None:
+            self._eviction_timer.cancel()
+            self._eviction_timer = None
+
+    def _schedule_eviction(self):
+        self._cancel_eviction()
+        if self._model is None or self._idle_timeout_sec <= 0:
+            return
+        self._eviction_timer = threading.Timer(
+            self._idle_timeout_sec, self._evict_if_idle
+        )
+        self._eviction_timer.daemon = True
+        self._eviction_timer.start()
+
+    def _evict_if_idle(self):
+        # Check and release under one lock so a `run()` cannot start in between.
+        with self._lock:
+            idle_sec = time.monotonic() - self._last_used
+            if idle_sec < self._idle_timeout_sec:
+                self._schedule_eviction()
+                return
+            self.release()
+
+
+_RESIDENT_MODEL = _ResidentModel(_load_model, IDLE_TIMEOUT_SEC)
+
+
+def set_idle_timeout(idle_timeout_sec: float):
+    _RESIDENT_MODEL.set_idle_timeout(idle_timeout_sec)
+
+
+def release():
+    """Frees the resident pipeline so other GPU models can be loaded."""
+    _RESIDENT_MODEL.release()
+
+
 def _build_prompt_with_system(prompt, system_prompt) -> str:
     return f"""
     {system_prompt}
@@ -21,23 +111,41 @@ def _build_prompt_with_system(prompt, system_prompt) -> str:
     """
 
 
-def completion(prompt: str, system_prompt: str, temperature: float) -> str:
-    model = _load_model()
+def completion(
+    prompt: str, system_prompt: str, temperature: float, seed: int | None = None
+) -> dict:
     passed_prompt = _build_prompt_with_system(prompt, system_prompt)
     if len(passed_prompt) > 5000:
         print("WARNING: Had to truncate the prompt to get it into memory.")
         print(passed_prompt)
 
-    result = model(
-        [
-            {"role": "user", "content": passed_prompt[:5000]},
-        ],
-        temperature=temperature,
-        max_new_tokens=1024,
-        do_sample=True,
-    )
+    def _generate(model):
+        from transformers import set_seed
+
+        # Seed under the model lock so a concurrent completion cannot reseed
+        # between this call's seeding and its generation.
+        if seed is not None:
+            set_seed(seed)
+        return model(
+            [
+                {"role": "user", "content": passed_prompt[:5000]},
+            ],
+            temperature=temperature,
+            max_new_tokens=1024,
+            do_sample=True,
+        )
+
+    result = _RESIDENT_MODEL.run(_generate)
     raw_result = result[0]["generated_text"][-1]["content"]
-    del model
-    torch.cuda.empty_cache()
-    gc.collect()
     return {"choices": [{"message": {"content": raw_result}}]}
+
+
+async def acompletion(
+    prompt: str, system_prompt: str, temperature: float, seed: int | None = None
+) -> dict:
+    # The resident pipeline serializes generation, so run it off the event loop.
+    return await asyncio.to_thread(completion, prompt, system_prompt, temperature, seed)
+
+
+async def aclose():
+    pass
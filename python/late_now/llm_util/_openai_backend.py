@@ -1,28 +1,53 @@
-import requests
 import os
 
+from late_now.llm_util._http import ChatCompletionsClient
+
 _OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+_OPENAI_API_BASE = os.environ.get("OPENAI_API_BASE", "https://api.openai.com/v1")
+MODEL_NAME = "gpt-4o"
+
+_CLIENT = ChatCompletionsClient(
+    base_url=_OPENAI_API_BASE,
+    api_key=_OPENAI_API_KEY,
+    max_concurrency=int(os.environ.get("OPENAI_MAX_CONCURRENCY", "8")),
+)
+
+
+def _request_body(prompt: str, system_prompt: str, temperature: float, seed) -> dict:
+    body = {
+        "model": MODEL_NAME,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": temperature,
+        "max_tokens": 1024,
+        "top_p": 1,
+        "frequency_penalty": 0,
+        "presence_penalty": 0,
+    }
+    if seed is not None:
+        body["seed"] = seed
+    return body
 
 
-def completion(prompt: str, system_prompt: str, temperature: float) -> str:
-    result = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {_OPENAI_API_KEY}",
-        },
-        json={
-            "model": "gpt-4o",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": temperature,
-            "max_tokens": 1024,
-            "top_p": 1,
-            "frequency_penalty": 0,
-            "presence_penalty": 0,
-        },
+def completion(
+    prompt: str, system_prompt: str, temperature: float, seed: int | None = None
+) -> dict:
+    result = _CLIENT.post(_request_body(prompt, system_prompt, temperature, seed))
+    print(result)
+    return result
+
+
+async def acompletion(
+    prompt: str, system_prompt: str, temperature: float, seed: int | None = None
+) -> dict:
+    result = await _CLIENT.apost(
+        _request_body(prompt, system_prompt, temperature, seed)
     )
-    print(result.json())
-    return result.json()
+    print(result)
+    return result
+
+
+async def aclose():
+    await _CLIENT.aclose()
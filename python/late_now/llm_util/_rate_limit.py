@@ -0,0 +1,93 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class _TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._refill_per_sec = per_minute / 60.0
+        self._updated = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self._updated
+        self.level = min(self.capacity, self.level + elapsed * self._refill_per_sec)
+        self._updated = now
+
+    def wait_for(self, amount: float) -> float:
+        missing = min(amount, self.capacity) - self.level
+        if missing <= 0:
+            return 0.0
+        return missing / self._refill_per_sec
+
+
+class RateLimiter:
+    """Requests/minute + tokens/minute limiter shared by every caller in the process.
+
+    Callers only block when one of the budgets is actually exhausted, or while a
+    server-provided `Retry-After` window is in effect.
+    """
+
+    def __init__(self, *, requests_per_minute: float, tokens_per_minute: float):
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _try_reserve(self, estimated_tokens: int) -> float:
+        """Reserves budget and returns 0, or returns how long to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            wait_sec = max(
+                self._requests.wait_for(1),
+                self._tokens.wait_for(estimated_tokens),
+            )
+            if wait_sec > 0:
+                return wait_sec
+
+            self._requests.level -= 1
+            self._tokens.level -= min(estimated_tokens, self._tokens.capacity)
+            return 0.0
+
+    def acquire(self, estimated_tokens: int):
+        while (wait_sec := self._try_reserve(estimated_tokens)) > 0:
+            time.sleep(wait_sec)
+
+    async def aacquire(self, estimated_tokens: int):
+        while (wait_sec := self._try_reserve(estimated_tokens)) > 0:
+            await asyncio.sleep(wait_sec)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Corrects the token budget once the server reports real usage."""
+        with self._lock:
+            self._tokens.level -= actual_tokens - estimated_tokens
+
+    def block_for(self, retry_after_sec: float):
+        with self._lock:
+            self._blocked_until = max(
+                self._blocked_until, time.monotonic() + retry_after_sec
+            )
+
+
+def estimate_tokens(*texts: str) -> int:
+    # Roughly 4 characters per token for English text.
+    return sum(len(text) for text in texts) // 4 + 1
+
+
+def backoff_delay_sec(
+    attempt: int, retry_after: str | None, base_sec: float = 1.0, max_sec: float = 60.0
+) -> float:
+    """Delay before retry `attempt`, honoring a `Retry-After` header when present."""
+    if retry_after is not None:
+        try:
+            return float(retry_after) + random.uniform(0, base_sec)
+        except ValueError:
+            pass
+    return random.uniform(0, min(max_sec, base_sec * 2**attempt))
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "LATE_NOW_LLM_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "late_now", "llm_responses"),
+)
+DEFAULT_MAX_BYTES = int(
+    os.environ.get("LATE_NOW_LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+
+def cache_key(
+    *,
+    backend: str,
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float,
+    seed: int | None,
+) -> str:
+    payload = json.dumps(
+        [backend, model, system_prompt, prompt, float(temperature), seed],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """On-disk LLM response store with size-bounded LRU eviction.
+
+    Entries are one JSON file per key; recency is tracked through the file
+    mtime so it survives across processes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "r") as f:
+                    value = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.misses += 1
+                return None
+            # Touch the entry so it becomes the most recently used.
+            os.utime(path)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: dict):
+        path = self._path(key)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=os.path.dirname(path), suffix=".tmp", delete=False
+            ) as f:
+                json.dump(value, f)
+            os.replace(f.name, path)
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        total_bytes = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+                total_bytes += stat.st_size
+
+        if total_bytes <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            os.unlink(path)
+            total_bytes -= size
+            if total_bytes <= self.max_bytes:
+                break
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+RESPONSE_CACHE = ResponseCache(DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES)
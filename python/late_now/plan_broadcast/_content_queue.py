@@ -1,4 +1,5 @@
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 import newspaper
 import requests
 from dataclasses import dataclass
@@ -56,3 +57,26 @@ class ContentQueue:
             articles.append(self.consume_news_article())
             n -= 1
         return articles
+
+    def consume_news_articles_concurrently(
+        self, n: int, max_workers: int = 4
+    ) -> list[NewsArticle | None]:
+        """Scrapes up to `n` articles in parallel, preserving queue order.
+
+        A link that fails to scrape yields `None` instead of failing the batch.
+        """
+        if n <= 0:
+            raise ValueError("Number of articles must be positive.")
+
+        links = self.article_links[:n]
+        del self.article_links[:n]
+
+        def _scrape_isolated(link: str) -> NewsArticle | None:
+            try:
+                return _scrape_link(link)
+            except Exception as e:
+                print(f"Error scraping {link}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_scrape_isolated, links))
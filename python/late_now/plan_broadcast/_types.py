@@ -1,5 +1,5 @@
 from abc import ABC
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import uuid
 import os
@@ -39,6 +39,13 @@ class BroadcastCameraCut:
     duration_sec: float
 
 
+@dataclass
+class BroadcastSpeechTiming:
+    start_sec: float  # Relative to the start of the sequence audio
+    duration_sec: float
+    sentence: str
+
+
 @dataclass
 class BroadcastParameters(SequenceParameters):
     text: str
@@ -47,6 +54,8 @@ class BroadcastParameters(SequenceParameters):
     character_to_animation: dict[str, str]  # The path to the animation data
     camera_cuts: list[BroadcastCameraCut]
     full_text_transcript: str
+    # When each spoken sentence plays, taken from the TTS fragments; used for subtitles
+    speech_timings: list[BroadcastSpeechTiming] = field(default_factory=list)
 
 
 @dataclass
@@ -2,6 +2,7 @@ from late_now.plan_broadcast._types import (
     BroadcastCameraCut,
     BroadcastDefintion,
     BroadcastParameters,
+    BroadcastSpeechTiming,
     PackagedShowSegment,
     ResourceStagingArea,
     SequenceDefinition,
@@ -68,6 +69,15 @@ def _create_broadcast_sequence(
                 )
                 for camera_name, duration_sec in camera_cuts_and_durations
             ],
+            speech_timings=[
+                BroadcastSpeechTiming(
+                    start_sec=audio_fragment.absolute_start_time_sec,
+                    duration_sec=audio_fragment.duration_sec,
+                    sentence=audio_fragment.sentence,
+                )
+                for audio_fragment in packaged_segment.audio_generation.audio_fragments
+                if audio_fragment.audio_type == "speech"
+            ],
         ),
         duration_sec=length_of_audio,
     )
@@ -3,31 +3,66 @@ from late_now.plan_broadcast._types import (
     ShowSegment,
     ResourceStagingArea,
 )
-from late_now.plan_broadcast.packaging._image_generation import image_for_segment
+from late_now.plan_broadcast.packaging._image_generation import (
+    aimage_prompt_for_segment,
+    image_for_segment,
+    image_prompt_for_segment,
+)
 from late_now.plan_broadcast.packaging._audio_generation import audio_for_segment
 from late_now.plan_broadcast.packaging._animation_generation import (
     animation_for_segment,
 )
+from late_now.plan_broadcast.packaging._scheduler import ResourceTag, StageScheduler
+import asyncio
 import os
-from late_now.llm_util import prompt_general_llm
+from late_now import llm_util
+from late_now.llm_util import (
+    aclose_llm_sessions,
+    aprompt_general_llm,
+    prompt_general_llm,
+    release_local_model,
+)
 
 
-def _make_title(show_segment: ShowSegment) -> str:
-    prompt = f"""
+def _title_prompt(show_segment: ShowSegment) -> str:
+    return f"""
         Given the following content from the weird late night show
         create a catchy title with no more than 6 words. Respond with the title and nothing else.
         
         Input: {show_segment.plain_text()!r}.
     """
-    return prompt_general_llm(prompt)
 
 
-def package_segment(
-    show_segment: ShowSegment, staging_area: ResourceStagingArea
+def _make_title(show_segment: ShowSegment) -> str:
+    return prompt_general_llm(_title_prompt(show_segment))
+
+
+async def _amake_title(show_segment: ShowSegment) -> str:
+    return await aprompt_general_llm(_title_prompt(show_segment))
+
+
+async def _atitle_and_image_prompt(show_segment: ShowSegment) -> tuple[str, str]:
+    # The title and the image prompt are independent, so keep both in flight.
+    try:
+        title, image_prompt = await asyncio.gather(
+            _amake_title(show_segment),
+            aimage_prompt_for_segment(show_segment),
+        )
+    finally:
+        await aclose_llm_sessions()
+    return title, image_prompt
+
+
+def _package_segment_media(
+    show_segment: ShowSegment,
+    staging_area: ResourceStagingArea,
+    title: str,
+    image_prompt: str,
 ) -> PackagedShowSegment:
-    title = _make_title(show_segment)
     audio_generation = audio_for_segment(show_segment, staging_area=staging_area)
-    image_abs_path = image_for_segment(show_segment, staging_area=staging_area)
+    image_abs_path = image_for_segment(
+        show_segment, staging_area=staging_area, image_prompt=image_prompt
+    )
     character_name_to_animation_path = animation_for_segment(
         show_segment, staging_area=staging_area, audio_generation=audio_generation
     )
@@ -39,3 +74,137 @@ def package_segment(
         relative_image_path=os.path.relpath(image_abs_path, staging_area.tmpdir),
         character_name_to_relative_animation_path=character_name_to_animation_path,
     )
+
+
+def package_segments_sequentially(
+    show_segments: list[ShowSegment], staging_area: ResourceStagingArea
+) -> list[PackagedShowSegment]:
+    """Packages segments one stage at a time.
+
+    Titles and image prompts for every segment come first, so a local LLM is
+    loaded once and released once rather than once per segment.
+    """
+    titles_and_image_prompts = [
+        asyncio.run(_atitle_and_image_prompt(show_segment))
+        for show_segment in show_segments
+    ]
+    # Free the LLM before F5-TTS and diffusers claim the GPU.
+    release_local_model()
+    return [
+        _package_segment_media(show_segment, staging_area, title, image_prompt)
+        for show_segment, (title, image_prompt) in zip(
+            show_segments, titles_and_image_prompts
+        )
+    ]
+
+
+def package_segment(
+    show_segment: ShowSegment, staging_area: ResourceStagingArea
+) -> PackagedShowSegment:
+    return package_segments_sequentially([show_segment], staging_area)[0]
+
+
+def _general_llm_resource_tag() -> ResourceTag:
+    if llm_util.ACTIVE_GENERAL_TYPE == llm_util.LLMBackendType.LOCAL:
+        return ResourceTag.GPU
+    return ResourceTag.NETWORK
+
+
+def package_segments(
+    show_segments: list[ShowSegment],
+    staging_area: ResourceStagingArea,
+    resource_limits: dict[ResourceTag, int] | None = None,
+) -> list[PackagedShowSegment]:
+    """Packages every segment with independent stages overlapped.
+
+    Titles, image prompts, TTS, diffusion and animation for all segments are
+    scheduled on per-resource pools, so e.g. one segment's animation runs while
+    the next one's image diffuses. With the local LLM backend every LLM stage
+    runs before the first GPU model stage and the LLM is released once, so it
+    is not reloaded per segment. With stub models the bundle matches the one
+    `package_segments_sequentially` produces, up to staging file names.
+    """
+    scheduler = StageScheduler(resource_limits)
+    llm_tag = _general_llm_resource_tag()
+    packaged_futures = []
+    try:
+        titles = [
+            scheduler.submit(
+                f"segment[{i}].title", llm_tag, lambda s=segment: _make_title(s)
+            )
+            for i, segment in enumerate(show_segments)
+        ]
+        image_prompts = [
+            scheduler.submit(
+                f"segment[{i}].image_prompt",
+                llm_tag,
+                lambda s=segment: image_prompt_for_segment(s),
+            )
+            for i, segment in enumerate(show_segments)
+        ]
+        # GPU model stages wait for this, so the local LLM is loaded once for
+        # all LLM stages and freed once before F5-TTS and diffusers load.
+        gpu_deps = ()
+        if llm_tag == ResourceTag.GPU:
+            gpu_deps = (
+                scheduler.submit(
+                    "release_local_model",
+                    ResourceTag.GPU,
+                    lambda *_: release_local_model(),
+                    deps=(*titles, *image_prompts),
+                ),
+            )
+
+        for i, segment in enumerate(show_segments):
+            audio_generation = scheduler.submit(
+                f"segment[{i}].audio",
+                ResourceTag.GPU,
+                lambda *_, s=segment: audio_for_segment(s, staging_area=staging_area),
+                deps=gpu_deps,
+            )
+            image_abs_path = scheduler.submit(
+                f"segment[{i}].image",
+                ResourceTag.GPU,
+                lambda prompt, *_, s=segment: image_for_segment(
+                    s, staging_area=staging_area, image_prompt=prompt
+                ),
+                deps=(image_prompts[i], *gpu_deps),
+            )
+            character_name_to_animation_path = scheduler.submit(
+                f"segment[{i}].animation",
+                ResourceTag.ANIMATION,
+                lambda audio, s=segment: animation_for_segment(
+                    s, staging_area=staging_area, audio_generation=audio
+                ),
+                deps=(audio_generation,),
+            )
+            packaged_futures.append(
+                scheduler.submit(
+                    f"segment[{i}].package",
+                    ResourceTag.CPU,
+                    lambda title, audio, image, animation, s=segment: (
+                        PackagedShowSegment(
+                            title=title,
+                            segment=s,
+                            audio_generation=audio,
+                            relative_image_path=os.path.relpath(
+                                image, staging_area.tmpdir
+                            ),
+                            character_name_to_relative_animation_path=animation,
+                        )
+                    ),
+                    deps=(
+                        titles[i],
+                        audio_generation,
+                        image_abs_path,
+                        character_name_to_animation_path,
+                    ),
+                )
+            )
+
+        packaged_segments = [future.result() for future in packaged_futures]
+    finally:
+        scheduler.shutdown()
+
+    scheduler.print_timings()
+    return packaged_segments
@@ -4,7 +4,11 @@ from late_now.plan_broadcast._types import (
     AudioGeneration,
 )
 import json
-from dataclasses import dataclass, asdict
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
 from late_now.plan_broadcast.packaging._animation_generation._blendshapes import (
     BlendshapeData,
     generate_blendshapes,
@@ -22,6 +26,50 @@ class AnimationData:
     bvh_data_strings: list[str]
 
 
+# "npy" writes the blendshape frames as a (frames, 52) float32 .npy next to the
+# animation JSON, which only keeps a relative `blendshape_frames_path`. "json"
+# keeps the legacy nested `{"values": [...]}` frames inline.
+ANIMATION_FORMAT = os.environ.get("LATE_NOW_ANIMATION_FORMAT", "npy")
+
+
+def _write_animation_data(
+    animation_data: AnimationData, staging_area: ResourceStagingArea
+) -> str:
+    animation_data_path = staging_area.animation_path(ext="json")
+    blendshape_data = animation_data.blendshape_data
+
+    if ANIMATION_FORMAT == "json":
+        serialized_blendshape_data = {
+            "blendshape_frames": [
+                {"values": frame}
+                for frame in blendshape_data.blendshape_frames.tolist()
+            ],
+            "blendshape_name_to_index": blendshape_data.blendshape_name_to_index,
+        }
+    else:
+        frames_path = os.path.splitext(animation_data_path)[0] + ".npy"
+        np.save(
+            frames_path,
+            np.ascontiguousarray(blendshape_data.blendshape_frames, dtype=np.float32),
+        )
+        serialized_blendshape_data = {
+            "blendshape_frames_path": staging_area.to_relative(frames_path),
+            "blendshape_name_to_index": blendshape_data.blendshape_name_to_index,
+        }
+
+    with open(animation_data_path, "w") as f:
+        json.dump(
+            {
+                "fps": animation_data.fps,
+                "absolute_start_time_sec": animation_data.absolute_start_time_sec,
+                "blendshape_data": serialized_blendshape_data,
+                "bvh_data_strings": animation_data.bvh_data_strings,
+            },
+            f,
+        )
+    return animation_data_path
+
+
 def animation_for_segment(
     segment: ShowSegment,
     staging_area: ResourceStagingArea,
@@ -47,9 +95,6 @@ def animation_for_segment(
             )
         ],
     )
-    animation_data_path = staging_area.animation_path(ext="json")
-
-    with open(animation_data_path, "w") as f:
-        json.dump(asdict(animation_data), f)
+    animation_data_path = _write_animation_data(animation_data, staging_area)
 
     return {"walter": staging_area.to_relative(animation_data_path)}
@@ -5,21 +5,16 @@ import json
 import os
 from dataclasses import dataclass
 import tempfile
+import numpy as np
 from scipy.io.wavfile import write as write_wav
 import subprocess
 import pkg_resources
 
 
-@dataclass(frozen=True)
-class BlendshapeCoefficients:
-    # 52 coefficients, ARKit style
-    values: list[float]
-
-
 @dataclass(frozen=True)
 class BlendshapeData:
-    # 52 coefficients, ARKit style
-    blendshape_frames: list[BlendshapeCoefficients]
+    # (num_frames, 52) float32 coefficients, ARKit style
+    blendshape_frames: np.ndarray
     blendshape_name_to_index: dict[str, int]
 
 
@@ -30,6 +25,67 @@ ANIPORTRAIT_ROOT = os.path.abspath(
 )
 BROADCAST_ROOT = pkg_resources.resource_filename(__name__, "assets/broadcasts/main/")
 
+# "subprocess" runs the AniPortrait CLI once per segment on all of its speech,
+# "stub" swaps the model for a deterministic fake driven by the audio energy.
+BLENDSHAPE_BACKEND = os.environ.get("LATE_NOW_BLENDSHAPE_BACKEND", "subprocess")
+FRAGMENT_SAMPLE_RATE = 24000
+
+# ARKit names in the order AniPortrait reports them, used by the stub backend.
+STUB_BLENDSHAPE_NAMES = [
+    "_neutral",
+    "browDownLeft",
+    "browDownRight",
+    "browInnerUp",
+    "browOuterUpLeft",
+    "browOuterUpRight",
+    "cheekPuff",
+    "cheekSquintLeft",
+    "cheekSquintRight",
+    "eyeBlinkLeft",
+    "eyeBlinkRight",
+    "eyeLookDownLeft",
+    "eyeLookDownRight",
+    "eyeLookInLeft",
+    "eyeLookInRight",
+    "eyeLookOutLeft",
+    "eyeLookOutRight",
+    "eyeLookUpLeft",
+    "eyeLookUpRight",
+    "eyeSquintLeft",
+    "eyeSquintRight",
+    "eyeWideLeft",
+    "eyeWideRight",
+    "jawForward",
+    "jawLeft",
+    "jawOpen",
+    "jawRight",
+    "mouthClose",
+    "mouthDimpleLeft",
+    "mouthDimpleRight",
+    "mouthFrownLeft",
+    "mouthFrownRight",
+    "mouthFunnel",
+    "mouthLeft",
+    "mouthLowerDownLeft",
+    "mouthLowerDownRight",
+    "mouthPressLeft",
+    "mouthPressRight",
+    "mouthPucker",
+    "mouthRight",
+    "mouthRollLower",
+    "mouthRollUpper",
+    "mouthShrugLower",
+    "mouthShrugUpper",
+    "mouthSmileLeft",
+    "mouthSmileRight",
+    "mouthStretchLeft",
+    "mouthStretchRight",
+    "mouthUpperUpLeft",
+    "mouthUpperUpRight",
+    "noseSneerLeft",
+    "noseSneerRight",
+]
+
 
 def _execute_in_virtualenv(working_directory, virtualenv_path, commands):
     # Construct the command to activate the virtual environment
@@ -61,16 +117,14 @@ def _convert_json_to_blendshape_data(blendshapes_raw: dict) -> BlendshapeData:
     blendshape_coefs = blendshapes_raw["blendshape_coefs"]
 
     return BlendshapeData(
-        blendshape_frames=[
-            BlendshapeCoefficients(values=coefs) for coefs in blendshape_coefs
-        ],
+        blendshape_frames=np.asarray(blendshape_coefs, dtype=np.float32).reshape(
+            -1, len(blendshape_names_to_indices)
+        ),
         blendshape_name_to_index=blendshape_names_to_indices,
     )
 
 
-def _blendshapes_for_fragment(
-    audio_fragment: AudioFragments, fps: int
-) -> BlendshapeData:
+def _blendshapes_for_audio(audio: np.ndarray, fps: int) -> BlendshapeData:
     # TODO: Actually use FPS
     with tempfile.TemporaryDirectory() as tempdir:
         # create tmpfiule for wav data
@@ -78,7 +132,7 @@ def _blendshapes_for_fragment(
         tmp_json_file = os.path.join(tempdir, "output_blendshapes.json")
 
         # TODO: standardize on sample rate
-        write_wav(tmp_wav_file, 24000, audio_fragment.audio)
+        write_wav(tmp_wav_file, FRAGMENT_SAMPLE_RATE, audio)
 
         _execute_in_virtualenv(
             working_directory=ANIPORTRAIT_ROOT,
@@ -96,6 +150,53 @@ def _blendshapes_for_fragment(
         return _convert_json_to_blendshape_data(blendshapes_raw)
 
 
+def _stub_blendshapes_for_audio(audio: np.ndarray, fps: int) -> BlendshapeData:
+    names_to_indices = {name: i for i, name in enumerate(STUB_BLENDSHAPE_NAMES)}
+    num_frames = int(len(audio) / FRAGMENT_SAMPLE_RATE * fps)
+    samples_per_frame = max(1, FRAGMENT_SAMPLE_RATE // fps)
+    frames = np.zeros((num_frames, len(names_to_indices)), dtype=np.float32)
+    if num_frames > 0:
+        framed = audio[: num_frames * samples_per_frame]
+        framed = np.pad(framed, (0, num_frames * samples_per_frame - len(framed)))
+        energy = np.sqrt(np.mean(framed.reshape(num_frames, -1) ** 2, axis=1))
+        frames[:, names_to_indices["jawOpen"]] = np.clip(energy * 4, 0, 1)
+    return BlendshapeData(
+        blendshape_frames=frames, blendshape_name_to_index=names_to_indices
+    )
+
+
+def _blendshapes_for_fragments(
+    audio_fragments: list[AudioFragments], fps: int
+) -> list[BlendshapeData]:
+    """Infers every fragment's blendshapes from one pass over their joined audio.
+
+    The AniPortrait CLI takes a single audio file, so the fragments are laid
+    back to back and the model is loaded once per segment instead of once per
+    sentence. The frames are then split at each fragment's sample offset.
+    """
+    infer = (
+        _stub_blendshapes_for_audio
+        if BLENDSHAPE_BACKEND == "stub"
+        else _blendshapes_for_audio
+    )
+    offsets = np.cumsum([0] + [len(fragment.audio) for fragment in audio_fragments])
+    blendshape_data = infer(
+        np.concatenate([fragment.audio for fragment in audio_fragments]), fps=fps
+    )
+
+    frames = blendshape_data.blendshape_frames
+    frame_bounds = np.minimum(
+        np.round(offsets / FRAGMENT_SAMPLE_RATE * fps).astype(np.int64), len(frames)
+    )
+    return [
+        BlendshapeData(
+            blendshape_frames=frames[start:end],
+            blendshape_name_to_index=blendshape_data.blendshape_name_to_index,
+        )
+        for start, end in zip(frame_bounds[:-1], frame_bounds[1:])
+    ]
+
+
 def _merge_blendshapes(
     blendshape_data_and_fragment: list[tuple[BlendshapeData, AudioFragments]],
     fps: int,
@@ -117,12 +218,15 @@ def _merge_blendshapes(
     last_duration = blendshape_data_and_fragment[-1][1].duration_sec
     expected_total_length_frames = int((last_start_time + last_duration) * fps)
 
-    merged_frames = []
+    # Gaps and tails stay zero; each fragment is copied in with one slice.
+    merged_frames = np.zeros(
+        (expected_total_length_frames, len(blendshape_index_to_name)),
+        dtype=np.float32,
+    )
+    cursor = 0
     end_of_previous_segment_sec = 0
 
     for blendshape_data, fragment in blendshape_data_and_fragment:
-        frames_to_extend = []
-
         start_of_current_fragment_sec = fragment.absolute_start_time_sec
         gap_length_sec = start_of_current_fragment_sec - end_of_previous_segment_sec
 
@@ -130,41 +234,27 @@ def _merge_blendshapes(
             start_of_current_fragment_sec + fragment.duration_sec
         )
 
-        # Fill the gap between the end of the previous fragment and the start of the current fragment
         expected_fragment_frames = int(
             (end_of_current_fragment_sec - end_of_previous_segment_sec) * fps
         )
-
         gap_frames = int(gap_length_sec * fps)
-        for _ in range(gap_frames):
-            frames_to_extend.append(BlendshapeCoefficients(values=[0.0] * 52))
-
-        assert len(frames_to_extend) == gap_frames, "Gap length mismatch"
-        # Append the blendshape data for the current fragment
-        frames_to_extend.extend(blendshape_data.blendshape_frames)
 
         # For some reason the model doesn't always predict a perfect number of frames
         # so we need to make sure the length of the blendshape data matches the expected length
-        tail_end_fill_frames = expected_fragment_frames - len(frames_to_extend)
-        if tail_end_fill_frames < 0:
-            print(f"WARNING HAD TO TRUNCATE FRAMES: {tail_end_fill_frames}")
-            frames_to_extend = frames_to_extend[:expected_fragment_frames]
-        else:
-            for _ in range(tail_end_fill_frames):
-                frames_to_extend.append(BlendshapeCoefficients(values=[0.0] * 52))
-
-        assert len(frames_to_extend) == expected_fragment_frames, "Length mismatch"
+        frames = blendshape_data.blendshape_frames
+        available_frames = max(expected_fragment_frames - gap_frames, 0)
+        if len(frames) > available_frames:
+            print(f"WARNING HAD TO TRUNCATE FRAMES: {available_frames - len(frames)}")
+        copy_start = min(cursor + gap_frames, expected_total_length_frames)
+        copy_end = min(
+            copy_start + min(len(frames), available_frames),
+            expected_total_length_frames,
+        )
+        merged_frames[copy_start:copy_end] = frames[: copy_end - copy_start]
 
-        merged_frames.extend(frames_to_extend)
+        cursor += expected_fragment_frames
         end_of_previous_segment_sec = end_of_current_fragment_sec
 
-    if len(merged_frames) < expected_total_length_frames:
-        tail_end_fill_frames = expected_total_length_frames - len(merged_frames)
-        for _ in range(tail_end_fill_frames):
-            merged_frames.append(BlendshapeCoefficients(values=[0.0] * 52))
-
-    assert expected_total_length_frames == len(merged_frames), "Length mismatch"
-
     return BlendshapeData(
         blendshape_name_to_index=blendshape_index_to_name,
         blendshape_frames=merged_frames,
@@ -176,13 +266,8 @@ def generate_blendshapes(
     *,
     fps: int,
 ) -> BlendshapeData:
-    fragments_and_blendshapes = []
-    for fragment in speech_fragments:
-        fragments_and_blendshapes.append(
-            (
-                _blendshapes_for_fragment(fragment, fps=fps),
-                fragment,
-            )
-        )
+    blendshapes = _blendshapes_for_fragments(speech_fragments, fps=fps)
+
+    fragments_and_blendshapes = list(zip(blendshapes, speech_fragments))
 
     return _merge_blendshapes(fragments_and_blendshapes, fps=fps)
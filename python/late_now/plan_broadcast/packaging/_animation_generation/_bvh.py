@@ -0,0 +1,120 @@
+import io
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class BvhMotion:
+    # Everything up to (not including) the MOTION keyword, kept verbatim.
+    hierarchy: str
+    frame_time_sec: float
+    # (num_frames, num_channels), in the channel order declared by the hierarchy.
+    channels: np.ndarray
+
+    @property
+    def num_frames(self) -> int:
+        return self.channels.shape[0]
+
+    @property
+    def num_channels(self) -> int:
+        return self.channels.shape[1]
+
+
+def _num_channels_in_hierarchy(hierarchy: str) -> int:
+    num_channels = 0
+    for line in hierarchy.splitlines():
+        tokens = line.split()
+        if tokens and tokens[0] == "CHANNELS":
+            num_channels += int(tokens[1])
+    return num_channels
+
+
+def parse_bvh(bvh_string: str) -> BvhMotion:
+    hierarchy, motion = bvh_string.split("MOTION", 1)
+    header_lines = motion.strip().split("\n", 2)
+    num_frames = int(header_lines[0].split(":")[1])
+    frame_time_sec = float(header_lines[1].split(":")[1])
+    num_channels = _num_channels_in_hierarchy(hierarchy)
+
+    values = np.array(
+        header_lines[2].split() if len(header_lines) > 2 else [], dtype=np.float64
+    )
+    return BvhMotion(
+        hierarchy=hierarchy,
+        frame_time_sec=frame_time_sec,
+        channels=values[: num_frames * num_channels].reshape(num_frames, num_channels),
+    )
+
+
+def write_bvh(motion: BvhMotion) -> str:
+    out = io.StringIO()
+    out.write(motion.hierarchy)
+    out.write("MOTION\n")
+    out.write(f"Frames: {motion.num_frames}\n")
+    out.write(f"Frame Time: {motion.frame_time_sec:.6f}\n")
+    np.savetxt(out, motion.channels, fmt="%.6f", delimiter=" ")
+    return out.getvalue()
+
+
+def resample(channels: np.ndarray, num_frames: int) -> np.ndarray:
+    """Linearly resamples (frames, channels) to exactly `num_frames` frames."""
+    if len(channels) == num_frames or len(channels) == 0:
+        return channels
+    if len(channels) == 1:
+        return np.repeat(channels, num_frames, axis=0)
+
+    source_positions = np.linspace(0, len(channels) - 1, num_frames)
+    lower = np.floor(source_positions).astype(np.int64)
+    upper = np.minimum(lower + 1, len(channels) - 1)
+    weight = (source_positions - lower)[:, None]
+    return channels[lower] * (1 - weight) + channels[upper] * weight
+
+
+def consolidate(
+    start_frame_length_and_motion: list[tuple[int, int, BvhMotion]],
+    total_num_frames: int,
+) -> BvhMotion:
+    """Lays fragments out on one timeline, holding the last pose across gaps.
+
+    Each fragment is resampled to its requested length before placement. Frames
+    before the first fragment hold its first pose, later fragments overwrite
+    earlier ones where they overlap.
+    """
+    assert len(start_frame_length_and_motion) > 0, "we need at least one"
+    ordered = sorted(start_frame_length_and_motion, key=lambda item: item[0])
+    reference = ordered[0][2]
+
+    channels = np.empty((total_num_frames, reference.num_channels), dtype=np.float64)
+    # Index of the frame each output frame copies from, -1 where not yet written.
+    source_frame = np.full(total_num_frames, -1, dtype=np.int64)
+
+    for start_frame, length_in_frames, motion in ordered:
+        if motion.num_channels != reference.num_channels:
+            raise ValueError(
+                f"BVH fragment has {motion.num_channels} channels, "
+                f"expected {reference.num_channels}"
+            )
+        if motion.num_frames == 0:
+            continue
+        fragment = resample(motion.channels, length_in_frames)
+        end_frame = min(start_frame + length_in_frames, total_num_frames)
+        if end_frame <= start_frame:
+            continue
+        channels[start_frame:end_frame] = fragment[: end_frame - start_frame]
+        source_frame[start_frame:end_frame] = np.arange(start_frame, end_frame)
+
+    written = source_frame >= 0
+    if not written.any():
+        channels[:] = reference.channels[:1] if reference.num_frames else 0.0
+    else:
+        # Hold-last-pose: forward fill unwritten frames, then back fill the head.
+        filled = np.maximum.accumulate(source_frame)
+        filled[filled < 0] = np.argmax(written)
+        channels = channels[filled]
+
+    return BvhMotion(
+        hierarchy=reference.hierarchy,
+        frame_time_sec=reference.frame_time_sec,
+        channels=channels,
+    )
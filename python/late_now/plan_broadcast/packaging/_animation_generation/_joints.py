@@ -1,11 +1,13 @@
 from late_now.plan_broadcast._types import (
     AudioFragments,
 )
+import hashlib
+import math
 import os
 from dataclasses import dataclass
 import tempfile
 import subprocess
-import bpy
+from late_now.plan_broadcast.packaging._animation_generation import _bvh
 
 
 MOTION_GENERATED_FPS = 20
@@ -16,6 +18,28 @@ MOMASK_CODE_ROOT = os.path.abspath(
     )
 )
 
+# "subprocess" runs the MoMask CLI once per distinct prompt, "stub" swaps the
+# model for a deterministic swaying skeleton.
+MOTION_BACKEND = os.environ.get("LATE_NOW_MOTION_BACKEND", "subprocess")
+
+_STUB_FRAME_TIME_SEC = 1 / MOTION_GENERATED_FPS
+_STUB_HIERARCHY = """HIERARCHY
+ROOT Hips
+{
+\tOFFSET 0.000000 0.000000 0.000000
+\tCHANNELS 6 Xposition Yposition Zposition Zrotation Yrotation Xrotation
+\tJOINT Spine
+\t{
+\t\tOFFSET 0.000000 10.000000 0.000000
+\t\tCHANNELS 3 Zrotation Yrotation Xrotation
+\t\tEnd Site
+\t\t{
+\t\t\tOFFSET 0.000000 10.000000 0.000000
+\t\t}
+\t}
+}
+"""
+
 
 def _execute_in_virtualenv(working_directory, virtualenv_path, commands):
     # Construct the command to activate the virtual environment
@@ -58,139 +82,81 @@ def _generate_bvh_string(prompt: str, num_frames: int) -> str:
             return content
 
 
-@dataclass
-class BvhItem:
-    start_frame: int
-    bvh_string: str
-    length_in_frames: int
-
-
-def _consolidate_bvh_strings(
-    start_frame_and_bvh_string: list[BvhItem],
-    total_num_frames: int,
-) -> BvhItem:
-    # Select and delete only armatures, not everything
-    bpy.ops.object.select_all(action="DESELECT")
-    for obj in bpy.data.objects:
-        if obj.type == "ARMATURE":
-            obj.select_set(True)
-    bpy.ops.object.delete()
-
-    # Sort the BvhItems by start_frame
-    sorted_items = sorted(start_frame_and_bvh_string, key=lambda x: x.start_frame)
-
-    # Import the first BVH to get the armature structure
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".bvh", delete=False
-    ) as temp_file:
-        temp_file.write(sorted_items[0].bvh_string)
-        temp_file.flush()
-        temp_file_path = temp_file.name
-
-    # Fix axis when importing the BVH (setting Z-up for Blender's coordinate system)
-    bpy.ops.import_anim.bvh(filepath=temp_file_path, axis_forward="Y", axis_up="Z")
-    os.unlink(temp_file_path)
-
-    armature = bpy.context.object
-    original_rotation = armature.rotation_euler.copy()  # Store the initial rotation
-
-    # Clear the imported animation data
-    armature.animation_data_clear()
-
-    # Create a new action for the consolidated animation
-    new_action = bpy.data.actions.new(name="Consolidated Action")
-    armature.animation_data_create()
-    armature.animation_data.action = new_action
-
-    current_frame = 0
-
-    for item in sorted_items:
-        # Import the current BVH
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".bvh", delete=False
-        ) as temp_file:
-            temp_file.write(item.bvh_string)
-            temp_file.flush()
-            temp_file_path = temp_file.name
-
-        # Ensure the same axis conversion is applied for each BVH import
-        bpy.ops.import_anim.bvh(filepath=temp_file_path, axis_forward="Y", axis_up="Z")
-        os.unlink(temp_file_path)
-
-        imported_armature = bpy.context.object
-        imported_action = imported_armature.animation_data.action
-
-        # Rotate 180 degrees along the X-axis if the armature is upside down
-        imported_armature.rotation_euler.x += (
-            3.14159  # Rotate by 180 degrees along X to flip vertically
+def _stub_bvh_string(prompt: str, num_frames: int) -> str:
+    phase = int(hashlib.sha256(prompt.encode()).hexdigest()[:8], 16) % 360
+    lines = [
+        _STUB_HIERARCHY + "MOTION",
+        f"Frames: {num_frames}",
+        f"Frame Time: {_STUB_FRAME_TIME_SEC:.6f}",
+    ]
+    for frame in range(num_frames):
+        sway = 10 * math.sin(math.radians(phase + frame * 9))
+        lines.append(
+            f"0.000000 90.000000 0.000000 {sway:.6f} 0.000000 0.000000 "
+            f"{sway / 2:.6f} 0.000000 0.000000"
         )
+    return "\n".join(lines) + "\n"
 
-        # Pad frames if there's a gap
-        if item.start_frame > current_frame:
-            for fcurve in new_action.fcurves:
-                last_value = (
-                    fcurve.evaluate(current_frame - 1) if current_frame > 0 else 0
-                )
-                fcurve.keyframe_points.insert(current_frame, last_value)
-                fcurve.keyframe_points.insert(item.start_frame - 1, last_value)
-
-        # Copy keyframes from the imported action to the new action
-        for fcurve in imported_action.fcurves:
-            new_fcurve = new_action.fcurves.find(
-                fcurve.data_path, index=fcurve.array_index
-            )
-            if not new_fcurve:
-                new_fcurve = new_action.fcurves.new(
-                    fcurve.data_path, index=fcurve.array_index
-                )
-
-            for keyframe in fcurve.keyframe_points:
-                new_frame = keyframe.co.x + item.start_frame
-                new_fcurve.keyframe_points.insert(new_frame, keyframe.co.y)
-
-        current_frame = item.start_frame + item.length_in_frames
 
-        # Delete the imported armature
-        bpy.data.objects.remove(imported_armature, do_unlink=True)
-
-    # Pad the end if necessary
-    if current_frame < total_num_frames:
-        for fcurve in new_action.fcurves:
-            last_value = fcurve.evaluate(current_frame - 1)
-            fcurve.keyframe_points.insert(current_frame, last_value)
-            fcurve.keyframe_points.insert(total_num_frames - 1, last_value)
+def _trim_bvh_string(bvh_string: str, num_frames: int) -> str:
+    motion = _bvh.parse_bvh(bvh_string)
+    return _bvh.write_bvh(
+        _bvh.BvhMotion(
+            hierarchy=motion.hierarchy,
+            frame_time_sec=motion.frame_time_sec,
+            channels=motion.channels[:num_frames],
+        )
+    )
 
-    # Set the scene end frame
-    bpy.context.scene.frame_end = total_num_frames
 
-    # Ensure the armature is selected and active
-    bpy.ops.object.select_all(action="DESELECT")
-    armature.select_set(True)
-    bpy.context.view_layer.objects.active = armature
+def _generate_bvh_strings(prompts_and_num_frames: list[tuple[str, int]]) -> list[str]:
+    """Generates one BVH per request, running each distinct prompt only once.
 
-    # Ensure we're in object mode
-    bpy.ops.object.mode_set(mode="OBJECT")
+    The MoMask CLI takes a single prompt per run, so this is what keeps the
+    number of model loads down: fragments sharing a prompt (e.g. the sentences
+    of one line, or every fragment without a body motion) reuse the longest
+    generated motion, trimmed to their own frame count.
+    """
+    prompt_to_num_frames = {}
+    for prompt, num_frames in prompts_and_num_frames:
+        prompt_to_num_frames[prompt] = max(
+            num_frames, prompt_to_num_frames.get(prompt, 0)
+        )
 
-    # Set the armature's rotation back to its original value
-    armature.rotation_euler = original_rotation
+    generate = _stub_bvh_string if MOTION_BACKEND == "stub" else _generate_bvh_string
+    prompt_to_bvh = {
+        prompt: generate(prompt, num_frames)
+        for prompt, num_frames in prompt_to_num_frames.items()
+    }
 
-    # Export the consolidated BVH
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".bvh", delete=False
-    ) as temp_file:
-        temp_file_path = temp_file.name
+    return [
+        _trim_bvh_string(prompt_to_bvh[prompt], num_frames)
+        for prompt, num_frames in prompts_and_num_frames
+    ]
 
-    bpy.ops.export_anim.bvh(filepath=temp_file_path)
 
-    # Read the exported file
-    with open(temp_file_path, "r") as f:
-        consolidated_bvh = f.read()
+@dataclass
+class BvhItem:
+    start_frame: int
+    bvh_string: str
+    length_in_frames: int
 
-    # Clean up the temporary file
-    os.unlink(temp_file_path)
 
+def _consolidate_bvh_strings(
+    start_frame_and_bvh_string: list[BvhItem],
+    total_num_frames: int,
+) -> BvhItem:
+    consolidated = _bvh.consolidate(
+        [
+            (item.start_frame, item.length_in_frames, _bvh.parse_bvh(item.bvh_string))
+            for item in start_frame_and_bvh_string
+        ],
+        total_num_frames,
+    )
     return BvhItem(
-        start_frame=0, bvh_string=consolidated_bvh, length_in_frames=total_num_frames
+        start_frame=0,
+        bvh_string=_bvh.write_bvh(consolidated),
+        length_in_frames=total_num_frames,
     )
 
 
@@ -202,23 +168,31 @@ def generate_bvh_poses(
 ) -> str:
     total_num_frames = int(num_seconds * MOTION_GENERATED_FPS)
 
-    bvh_items = []
+    fragment_frame_starts = []
+    prompts_and_num_frames = []
     for speech_fragment in speech_fragments:
-        fragment_frame_start = int(
-            speech_fragment.absolute_start_time_sec * MOTION_GENERATED_FPS
+        fragment_frame_starts.append(
+            int(speech_fragment.absolute_start_time_sec * MOTION_GENERATED_FPS)
         )
-        fragment_frame_count = int(speech_fragment.duration_sec * MOTION_GENERATED_FPS)
-        bvh_single_string = _generate_bvh_string(
-            speech_fragment.line_body_motion or _DEFAULT_BODY_MOTION_PROMPT,
-            fragment_frame_count,
-        )
-        bvh_items.append(
-            BvhItem(
-                start_frame=fragment_frame_start,
-                bvh_string=bvh_single_string,
-                length_in_frames=fragment_frame_count,
+        prompts_and_num_frames.append(
+            (
+                speech_fragment.line_body_motion or _DEFAULT_BODY_MOTION_PROMPT,
+                int(speech_fragment.duration_sec * MOTION_GENERATED_FPS),
             )
         )
 
+    bvh_items = [
+        BvhItem(
+            start_frame=fragment_frame_start,
+            bvh_string=bvh_single_string,
+            length_in_frames=fragment_frame_count,
+        )
+        for fragment_frame_start, (_, fragment_frame_count), bvh_single_string in zip(
+            fragment_frame_starts,
+            prompts_and_num_frames,
+            _generate_bvh_strings(prompts_and_num_frames),
+        )
+    ]
+
     single_bvh = _consolidate_bvh_strings(bvh_items, total_num_frames)
     return single_bvh.bvh_string
@@ -1,6 +1,9 @@
 import nltk  # we'll use this to split into sentences
 import numpy as np
 import os
+import soundfile as sf
+import zlib
+from dataclasses import dataclass
 from functools import cache
 from late_now.plan_broadcast._types import (
     AudioFragments,
@@ -10,7 +13,6 @@ from late_now.plan_broadcast._types import (
     ShowSegment,
 )
 from late_now.plan_broadcast.packaging import _f5_tts_infer
-from scipy.io.wavfile import write as write_wav
 from transformers import AutoProcessor, BarkModel
 import torchaudio
 import pkg_resources
@@ -27,19 +29,51 @@ EFFECTS_TO_FILENAME = {
     "CROWD_OOH": "resources/audio/sound_effects/ooh/ooh.wav",
 }
 VOICE_PRESET = "v2/en_speaker_6"
+# "f5" synthesizes speech with F5-TTS, "stub" swaps it for deterministic tones
+TTS_BACKEND = os.environ.get("LATE_NOW_TTS_BACKEND", "f5")
+# Samples mixed and written per block by _TimelineMixer.write_wav
+MIX_BLOCK_SAMPLES = 1 << 16
 
 
 def _get_variable_silence(duration_sec: int) -> np.ndarray:
-    return np.zeros(int(duration_sec * _get_sample_rate()))  # quarter second of silence
+    return np.zeros(int(duration_sec * _get_sample_rate()), dtype=np.float32)  # quarter second of silence
 
 
+@cache
 def _get_volume_fade_for_sound_effect(sound_effect: str, num_samples: int) -> np.array:
     if sound_effect in ["APPLAUSE", "LAUGHTER", "CROWD_AWW", "CROWD_OOH"]:
-        return np.linspace(1, 0, num_samples)
+        fade = np.linspace(1, 0, num_samples, dtype=np.float32)
     elif sound_effect in ["INTRO_MUSIC", "SILENCE"]:
-        return np.linspace(1, 1, num_samples)
+        fade = np.ones(num_samples, dtype=np.float32)
     else:
         raise ValueError()
+    fade.flags.writeable = False
+    return fade
+
+
+@cache
+def _get_sound_effect_bank() -> dict[str, np.ndarray]:
+    """Every sound effect file decoded once, as mono float32 at the mix sample rate."""
+    bank = {}
+    for options in EFFECTS_TO_FILENAME.values():
+        for file_name in options if isinstance(options, list) else [options]:
+            data, sample_rate = torchaudio.load(pkg_resources.resource_filename(__name__, file_name))
+            data = torchaudio.functional.resample(data.mean(dim=0), sample_rate, _get_sample_rate())
+            bank[file_name] = data.numpy().astype(np.float32)
+            bank[file_name].flags.writeable = False
+    return bank
+
+
+@cache
+def _get_sound_effect_clip(sound_effect: str, file_name: str, duration_samples: int) -> np.ndarray:
+    # Shared between every cue of the same effect and length, so read-only
+    data = _get_sound_effect_bank()[file_name]
+    if len(data) < duration_samples:
+        data = np.tile(data, duration_samples // len(data) + 1)
+    # Fade over the course of duration_samples, also when the file is exactly that long
+    clip = data[:duration_samples] * _get_volume_fade_for_sound_effect(sound_effect, duration_samples)
+    clip.flags.writeable = False
+    return clip
 
 
 def _get_sound_effect_data(sound_effect: str, duration: int) -> np.array:
@@ -48,51 +82,133 @@ def _get_sound_effect_data(sound_effect: str, duration: int) -> np.array:
 
     options = EFFECTS_TO_FILENAME[sound_effect]
     if isinstance(options, list):
-        file_path = pkg_resources.resource_filename(__name__, np.random.choice(options))
+        file_name = np.random.choice(options)
     else:
-        file_path = pkg_resources.resource_filename(__name__, options)
+        file_name = options
 
-    data, _ = torchaudio.load(file_path)
-    data = data.squeeze().numpy()
-
-    duration_samples = int(duration * _get_sample_rate())
-    fade = _get_volume_fade_for_sound_effect(sound_effect, duration_samples)
-
-    if len(data) > duration_samples:
-        # Fade over the course of duration_samples
-        data = data[:duration_samples] * fade
-
-    elif len(data) < duration_samples:
-        data = np.tile(data, duration_samples // len(data) + 1)
-        data = data[:duration_samples] * fade
-
-    return data
+    return _get_sound_effect_clip(sound_effect, file_name, int(duration * _get_sample_rate()))
 
 
 @cache
 def _get_pad_silence(sample_rate) -> np.ndarray:
-    return np.zeros(int(0.25 * sample_rate)) 
-
-
-def _generate_audio_for_line(text: str) -> tuple[np.ndarray, list[tuple[str, float]]]:
-    pieces = []
-    sentences = nltk.sent_tokenize(text)
-    sentences_and_durations = []
-
-    for _, sentence in enumerate(sentences):
-        audio_array, sample_rate = _f5_tts_infer.audio_and_sample_rate_for_setence(sentence)
-        pad_silence = _get_pad_silence(int(sample_rate)).copy()
-        piece = [audio_array, pad_silence]
-        pieces += piece
-        piece_duration = (len(audio_array) + len(pad_silence)) / sample_rate
-        sentences_and_durations.append((sentence, piece_duration))
-
-    return np.concatenate(pieces), sentences_and_durations
-
-
-def _soft_clip(x):
+    return np.zeros(int(0.25 * sample_rate), dtype=np.float32)
+
+
+def _stub_audio_for_sentences(sentences: list[str]) -> (list[np.ndarray], int):
+    # One tone per sentence, pitched by its checksum and lasting 60ms per character
+    sample_rate = _get_sample_rate()
+    audio_arrays = []
+    for sentence in sentences:
+        pitch_hz = 110 + zlib.crc32(sentence.encode("utf-8")) % 220
+        t = np.arange(int(0.06 * len(sentence) * sample_rate)) / sample_rate
+        audio_arrays.append((0.3 * np.sin(2 * np.pi * pitch_hz * t)).astype(np.float32))
+    return audio_arrays, sample_rate
+
+
+def _generate_audio_for_lines(texts: list[str]) -> list[tuple[np.ndarray, list[tuple[str, np.ndarray]]]]:
+    """Speech for each line and each of its sentences, as views of one buffer.
+
+    Every sentence of every line is synthesized in one batched call, then laid
+    out back to back with its trailing pad in a single float32 buffer. A line's
+    audio and its sentences' audio are slices of that buffer, so a sentence
+    references exactly its own samples without copying the line.
+    """
+    lines_sentences = [nltk.sent_tokenize(text) for text in texts]
+    audio_for_sentences = (
+        _stub_audio_for_sentences if TTS_BACKEND == "stub" else _f5_tts_infer.audio_for_sentences
+    )
+    audio_arrays, sample_rate = audio_for_sentences(
+        [sentence for sentences in lines_sentences for sentence in sentences]
+    )
+    pad_length = len(_get_pad_silence(int(sample_rate)))
+
+    speech = np.zeros(sum(len(audio_array) + pad_length for audio_array in audio_arrays), dtype=np.float32)
+    cursor = 0
+    lines = []
+    audio_iter = iter(audio_arrays)
+    for sentences in lines_sentences:
+        line_start = cursor
+        sentences_and_audio = []
+        for sentence in sentences:
+            audio_array = next(audio_iter)
+            speech[cursor:cursor + len(audio_array)] = audio_array
+            sentence_end = cursor + len(audio_array) + pad_length
+            sentences_and_audio.append((sentence, speech[cursor:sentence_end]))
+            cursor = sentence_end
+        lines.append((speech[line_start:cursor], sentences_and_audio))
+    return lines
+
+
+def _soft_clip(x, out=None):
     """Applies soft clipping to the input signal."""
-    return np.arctan(x)
+    return np.arctan(x, out=out)
+
+
+@dataclass(frozen=True)
+class _TimelineClip:
+    start_sample: int
+    audio: np.ndarray
+
+    @property
+    def end_sample(self) -> int:
+        return self.start_sample + len(self.audio)
+
+
+class _TimelineMixer:
+    """Sums clips placed at known sample offsets into one soft clipped track.
+
+    Clips reference their audio without copying it, the speech buffer and the
+    cached sound effects stay in memory until the mixer is dropped. Only the
+    mix itself is bounded: it is summed and written one fixed-size block at a
+    time, so it never exists as a whole however long the segment is.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.num_samples = 0
+        self._clips: list[_TimelineClip] = []
+
+    @property
+    def duration_sec(self) -> float:
+        return self.num_samples / self.sample_rate
+
+    def add(self, start_sample: int, audio: np.ndarray):
+        if len(audio):
+            self._clips.append(_TimelineClip(start_sample, audio))
+        self.extend_to(start_sample + len(audio))
+
+    def extend_to(self, num_samples: int):
+        self.num_samples = max(self.num_samples, num_samples)
+
+    def _mix_into(self, out: np.ndarray, start_sample: int, clips: list[_TimelineClip]):
+        end_sample = start_sample + len(out)
+        for clip in clips:
+            lo, hi = max(clip.start_sample, start_sample), min(clip.end_sample, end_sample)
+            if lo < hi:
+                out[lo - start_sample:hi - start_sample] += clip.audio[lo - clip.start_sample:hi - clip.start_sample]
+        _soft_clip(out, out=out)
+
+    def blocks(self, block_samples: int = MIX_BLOCK_SAMPLES):
+        """Yields the mix in consecutive blocks, the yielded buffer is reused."""
+        clips = sorted(self._clips, key=lambda clip: clip.start_sample)
+        buffer = np.empty(block_samples, dtype=np.float32)
+        active, next_clip = [], 0
+        for block_start in range(0, self.num_samples, block_samples):
+            block = buffer[:min(block_samples, self.num_samples - block_start)]
+            block.fill(0)
+            block_end = block_start + len(block)
+            while next_clip < len(clips) and clips[next_clip].start_sample < block_end:
+                active.append(clips[next_clip])
+                next_clip += 1
+            self._mix_into(block, block_start, active)
+            active = [clip for clip in active if clip.end_sample > block_end]
+            yield block
+
+    def write_wav(self, path: str):
+        """Writes the mix as a mono 32-bit float WAV."""
+        with sf.SoundFile(path, "w", samplerate=self.sample_rate, channels=1, subtype="FLOAT") as f:
+            for block in self.blocks():
+                f.write(block)
 
 
 def _walter_pause_for_sound_effect_length(
@@ -119,20 +235,21 @@ def _get_sample_rate():
 
 def _generate_long_audio(
     detailed_script: SegmentDetailedScript,
-) -> tuple[np.ndarray, list[tuple[str, float]], float]:
+) -> tuple[_TimelineMixer, list[AudioFragments], float]:
 
-    walter_pieces = []
-    sound_effect_pieces = []
+    mixer = _TimelineMixer(_get_sample_rate())
     audio_fragments = []
     total_sound_effect_duration_sec = 0
     total_walter_duration_sec = 0
+    # Where the next piece of each track starts on the shared timeline
+    walter_cursor = 0
+    sound_effect_cursor = 0
 
-    def _print_track_lengths():
-        tmp_walter_track = np.concatenate(walter_pieces)
-        tmp_sound_effect_track = np.concatenate(sound_effect_pieces)
-        print(
-            f"walter: {len(tmp_walter_track) / _get_sample_rate()} sound: {len(tmp_sound_effect_track) / _get_sample_rate()}"
+    line_audio = iter(
+        _generate_audio_for_lines(
+            [line.content["text"] for line in detailed_script.lines if line.line_type == "dialog"]
         )
+    )
 
     for line in detailed_script.lines:
         print(
@@ -163,8 +280,9 @@ def _generate_long_audio(
                     line_body_motion=None,
                 )
             )
-            sound_effect_pieces.append(sound_effect_audio)
-            walter_pieces.append(_get_variable_silence(walter_pause_length_sec))
+            mixer.add(sound_effect_cursor, sound_effect_audio)
+            sound_effect_cursor += len(sound_effect_audio)
+            walter_cursor += int(walter_pause_length_sec * _get_sample_rate())
 
             # Append length
             total_sound_effect_duration_sec += effect_duration_sec
@@ -172,9 +290,7 @@ def _generate_long_audio(
 
         elif line.line_type == "dialog":
             # Create speech
-            piece_audio, piece_sentences_and_durations = _generate_audio_for_line(
-                line.content["text"]
-            )
+            piece_audio, piece_sentences_and_audio = next(line_audio)
             total_walter_piece_duration_sec = len(piece_audio) / _get_sample_rate()
 
             # Create sound effect pause length to align with the end of the walter speech
@@ -186,12 +302,13 @@ def _generate_long_audio(
 
             # Save pieces
 
-            for piece_sentence, piece_duration in piece_sentences_and_durations:
+            for piece_sentence, sentence_audio in piece_sentences_and_audio:
+                piece_duration = len(sentence_audio) / _get_sample_rate()
                 audio_fragments.append(
                     AudioFragments(
                         absolute_start_time_sec=total_walter_duration_sec,
                         audio_type="speech",
-                        audio=piece_audio,
+                        audio=sentence_audio,
                         duration_sec=piece_duration,
                         sentence=piece_sentence,
                         line_body_motion=line.content.get("body_motion"),
@@ -199,47 +316,35 @@ def _generate_long_audio(
                 )
                 total_walter_duration_sec += piece_duration
 
-            sound_effect_pieces.append(
-                _get_variable_silence(sound_effect_pause_length_sec)
-            )
-            walter_pieces.append(piece_audio)
+            sound_effect_cursor += int(sound_effect_pause_length_sec * _get_sample_rate())
+            mixer.add(walter_cursor, piece_audio)
+            walter_cursor += len(piece_audio)
 
             # Append length
             total_sound_effect_duration_sec += sound_effect_pause_length_sec
 
-        print(f"{line} {_print_track_lengths()}")
-
-    walter_track = np.concatenate(walter_pieces)
-    sound_effect_track = np.concatenate(sound_effect_pieces)
-
-    def pad_smaller_track(track_a, track_b):
-        if len(track_a) < len(track_b):
-            track_a = np.pad(track_a, (0, len(track_b) - len(track_a)))
-        elif len(track_b) < len(track_a):
-            track_b = np.pad(track_b, (0, len(track_a) - len(track_b)))
-        return track_a, track_b
-
-    walter_track, sound_effect_track = pad_smaller_track(
-        walter_track, sound_effect_track
-    )
-    total_duration = len(walter_track) / _get_sample_rate()
+        print(
+            f"{line} walter: {walter_cursor / _get_sample_rate()} sound: {sound_effect_cursor / _get_sample_rate()}"
+        )
 
+    # Trailing pauses are silence but still belong to the show
+    mixer.extend_to(max(walter_cursor, sound_effect_cursor))
 
     return (
-        _soft_clip(walter_track + sound_effect_track),
+        mixer,
         audio_fragments,
-        total_duration,
+        mixer.duration_sec,
     )
 
 
 def audio_for_segment(
     segment: ShowSegment, staging_area: ResourceStagingArea
 ) -> AudioGeneration:
-    long_audio, audio_fragments, total_duration = _generate_long_audio(
+    mixer, audio_fragments, total_duration = _generate_long_audio(
         segment.detailed_script
     )
     speech_path = staging_area.audio_path(ext="wav")
-    write_wav(speech_path, _get_sample_rate(), long_audio)
+    mixer.write_wav(speech_path)
 
     return AudioGeneration(
         total_duration_sec=total_duration,
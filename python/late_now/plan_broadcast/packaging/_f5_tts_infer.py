@@ -14,6 +14,10 @@ from cached_path import cached_path
 from omegaconf import OmegaConf
 
 from f5_tts.infer.utils_infer import (
+    chunk_text,
+    device,
+    hop_length,
+    target_sample_rate,
     mel_spec_type,
     target_rms,
     cross_fade_duration,
@@ -29,8 +33,13 @@ from f5_tts.infer.utils_infer import (
     remove_silence_for_generated_wav,
 )
 from f5_tts.model import DiT, UNetT
+from f5_tts.model.utils import convert_char_to_pinyin
+from dataclasses import dataclass, replace
 from functools import cache
 import pkg_resources
+import time
+import torch
+import torchaudio
 
 # Constants
 MODEL_NAME = "F5-TTS"
@@ -43,6 +52,66 @@ VOCODER_NAME = "vocos"
 REPO_NAME = "F5-TTS"
 EXP_NAME = "F5TTS_Base"
 CKPT_STEP = 1200000
+# Sentences synthesized together in one DiT + vocoder pass, see audio_for_sentences
+BATCH_SIZE = int(os.environ.get("LATE_NOW_TTS_BATCH_SIZE", 8))
+
+
+def _physical_core_count() -> int:
+    """Cores this process may run on, counting SMT siblings once."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = os.sched_getaffinity(0)
+    else:
+        cpus = range(os.cpu_count() or 1)
+    cores = set()
+    for cpu in cpus:
+        topology = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+        try:
+            with open(f"{topology}/physical_package_id") as package, open(f"{topology}/core_id") as core:
+                cores.add((package.read().strip(), core.read().strip()))
+        except OSError:
+            # No sysfs topology (e.g. macOS), fall back to logical CPUs
+            return len(cpus)
+    return len(cores) or len(cpus)
+
+
+# Intra-op threads of the CPU profiles, one per physical core unless overridden
+CPU_THREADS = int(os.environ.get("LATE_NOW_TTS_THREADS", 0)) or _physical_core_count()
+
+
+@dataclass(frozen=True)
+class InferenceProfile:
+    device: str
+    nfe_step: int
+    # Dynamic int8 quantization of every nn.Linear in the DiT and the vocoder (CPU only)
+    quantize_int8: bool = False
+    # Intra-op threads for torch, None leaves the torch default
+    num_threads: int | None = None
+    # Inter-op threads for torch, None leaves the torch default. Can only be set
+    # before torch runs any parallel work, later changes are ignored.
+    num_interop_threads: int | None = None
+
+
+INFERENCE_PROFILES = {
+    "default": InferenceProfile(device=device, nfe_step=nfe_step),
+    # The DiT and vocoder run their ops one after another, so a single inter-op
+    # thread keeps it from competing with the intra-op pool for the same cores
+    "cpu": InferenceProfile(
+        device="cpu", nfe_step=nfe_step, quantize_int8=True, num_threads=CPU_THREADS, num_interop_threads=1
+    ),
+    # Fewer flow steps trade some quality for roughly proportional speed
+    "cpu_draft": InferenceProfile(
+        device="cpu", nfe_step=16, quantize_int8=True, num_threads=CPU_THREADS, num_interop_threads=1
+    ),
+}
+INFERENCE_PROFILE = os.environ.get("LATE_NOW_TTS_PROFILE", "default")
+
+BENCHMARK_SENTENCES = [
+    "Good evening and welcome to the show.",
+    "Tonight we have a story that will make you laugh, cry, and maybe even think.",
+    "El Paso just built the largest solar co-op in the state.",
+    "And honestly, folks, I did not see that one coming.",
+    "Stick around, because after the break we are talking about llamas.",
+]
 
 
 @cache
@@ -67,13 +136,28 @@ def _get_voices() -> dict[str, dict[str, str]]:
         )
     return voice_to_reference_data
 
+
+def _apply_threads(profile: InferenceProfile):
+    if profile.num_threads is not None:
+        torch.set_num_threads(profile.num_threads)
+    if profile.num_interop_threads is not None and torch.get_num_interop_threads() != profile.num_interop_threads:
+        try:
+            torch.set_num_interop_threads(profile.num_interop_threads)
+        except RuntimeError:
+            print(f"Could not set {profile.num_interop_threads} inter-op threads after torch started parallel work")
+
+
 @cache
-def _get_model_and_vocoder():
+def _get_model_and_vocoder(profile_name: str = "default"):
+    profile = INFERENCE_PROFILES[profile_name]
+    _apply_threads(profile)
+
     # Load vocoder
     vocoder = load_vocoder(
         vocoder_name=VOCODER_NAME,
         is_local=False,
-        local_path="../checkpoints/vocos-mel-24khz"
+        local_path="../checkpoints/vocos-mel-24khz",
+        device=profile.device,
     )
 
     # Load model configuration
@@ -84,12 +168,21 @@ def _get_model_and_vocoder():
     # Load model checkpoint
     ckpt_file = str(cached_path(f"hf://SWivid/{REPO_NAME}/{EXP_NAME}/model_{CKPT_STEP}.safetensors"))
 
-    print(f"Using {MODEL_NAME}...")
+    print(f"Using {MODEL_NAME} with the {profile_name} profile...")
 
     ema_model = load_model(
         DiT, model_cfg, ckpt_file,
         mel_spec_type=VOCODER_NAME,
+        device=profile.device,
     )
+
+    if profile.quantize_int8:
+        ema_model = torch.ao.quantization.quantize_dynamic(
+            ema_model.eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+        vocoder = torch.ao.quantization.quantize_dynamic(
+            vocoder.eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
     return ema_model, vocoder
 
 
@@ -132,6 +225,133 @@ def _generate_audio_segments(gen_text, voice_name, ema_model, vocoder):
     return generated_audio_segments, final_sample_rate
 
 
+@cache
+def _get_reference_audio(voice_name):
+    """Reference audio for a voice as a (1, samples) tensor ready for the model."""
+    voice = _get_voices()[voice_name]
+    audio, sample_rate = torchaudio.load(voice["ref_audio"])
+    if audio.shape[0] > 1:
+        audio = torch.mean(audio, dim=0, keepdim=True)
+    rms = torch.sqrt(torch.mean(torch.square(audio)))
+    if rms < target_rms:
+        audio = audio * target_rms / rms
+    if sample_rate != target_sample_rate:
+        audio = torchaudio.transforms.Resample(sample_rate, target_sample_rate)(audio)
+    return audio, rms.item()
+
+
+def _split_into_chunks(gen_text, voice_name):
+    """Same text chunks infer_process would synthesize for `gen_text`.
+
+    Returns one list of chunks per `[tag]` separated part, infer_process
+    cross-fades the chunks of a part while parts are simply concatenated.
+    """
+    ref_audio, _ = _get_reference_audio(voice_name)
+    ref_text = _get_voices()[voice_name]["ref_text"]
+    ref_audio_sec = ref_audio.shape[-1] / target_sample_rate
+    max_chars = int(len(ref_text.encode("utf-8")) / ref_audio_sec * (25 - ref_audio_sec))
+
+    parts = []
+    for text in re.split(r"(?=\[\w+\])", gen_text):
+        text = re.sub(r"\[(\w+)\]", "", text).strip()
+        if text:
+            parts.append([chunk for chunk in chunk_text(text, max_chars=max_chars) if chunk.strip()])
+    return parts
+
+
+def _cross_fade(waves):
+    """Joins consecutive chunk waves the way infer_process does."""
+    final_wave = waves[0]
+    for next_wave in waves[1:]:
+        cross_fade_samples = min(int(cross_fade_duration * target_sample_rate), len(final_wave), len(next_wave))
+        if cross_fade_samples <= 0:
+            final_wave = np.concatenate([final_wave, next_wave])
+            continue
+        fade_out = np.linspace(1, 0, cross_fade_samples)
+        fade_in = np.linspace(0, 1, cross_fade_samples)
+        cross_faded_overlap = final_wave[-cross_fade_samples:] * fade_out + next_wave[:cross_fade_samples] * fade_in
+        final_wave = np.concatenate(
+            [final_wave[:-cross_fade_samples], cross_faded_overlap, next_wave[cross_fade_samples:]]
+        )
+    return final_wave
+
+
+def _synthesize_batch(gen_texts, voice_name, ema_model, vocoder, profile: InferenceProfile):
+    """One DiT sampling pass for several texts at once, vocoded per text."""
+    ref_audio, ref_rms = _get_reference_audio(voice_name)
+    ref_text = _get_voices()[voice_name]["ref_text"]
+    if not ref_text.endswith(" "):
+        ref_text += " "
+    ref_audio_len = ref_audio.shape[-1] // hop_length
+    ref_text_len = len(ref_text.encode("utf-8"))
+
+    durations = [
+        ref_audio_len + int(ref_audio_len / ref_text_len * len(text.encode("utf-8")) / speed)
+        for text in gen_texts
+    ]
+    cond = ref_audio.to(profile.device).expand(len(gen_texts), -1)
+
+    with torch.inference_mode():
+        generated, _ = ema_model.sample(
+            cond=cond,
+            text=convert_char_to_pinyin([ref_text + text for text in gen_texts]),
+            duration=torch.tensor(durations, device=profile.device),
+            steps=profile.nfe_step,
+            cfg_strength=cfg_strength,
+            sway_sampling_coef=sway_sampling_coef,
+        )
+        # Each mel is trimmed to its own duration before decoding, the vocoder's
+        # convolutions would otherwise smear the batch padding into short texts.
+        results = []
+        for mel, duration in zip(generated.to(torch.float32), durations):
+            mel = mel[ref_audio_len:duration, :].permute(1, 0).unsqueeze(0)
+            wave = vocoder.decode(mel).squeeze(0).cpu().numpy()
+            if ref_rms < target_rms:
+                wave = wave * ref_rms / target_rms
+            results.append(wave)
+    return results
+
+
+def audio_for_sentences(
+    sentences,
+    voice: str = DEFAULT_SPEAKER,
+    batch_size: int = BATCH_SIZE,
+    profile_name: str = INFERENCE_PROFILE,
+) -> (list[np.array], int):
+    """Batched counterpart of `audio_and_sample_rate_for_setence`.
+
+    Every sentence is split into the chunks the per-sentence path would
+    synthesize, chunks are sorted by length so each batch pads little, and the
+    waves are cross-faded back per sentence in the original order. Runs on the
+    device of the inference profile, including CPU.
+    """
+    profile = INFERENCE_PROFILES[profile_name]
+    chunks = []  # (sentence index, part index, chunk text)
+    for sentence_index, sentence in enumerate(sentences):
+        for part_index, part in enumerate(_split_into_chunks(sentence, voice)):
+            for chunk in part:
+                chunks.append((sentence_index, part_index, chunk))
+    if chunks:
+        model, vocoder = _get_model_and_vocoder(profile_name)
+        _apply_threads(profile)
+
+    order = sorted(range(len(chunks)), key=lambda i: len(chunks[i][2].encode("utf-8")))
+    chunk_waves = [None] * len(chunks)
+    for batch_start in range(0, len(order), batch_size):
+        batch = order[batch_start:batch_start + batch_size]
+        waves = _synthesize_batch([chunks[i][2] for i in batch], voice, model, vocoder, profile)
+        for i, wave in zip(batch, waves):
+            chunk_waves[i] = wave
+
+    sentence_parts = [{} for _ in sentences]
+    for (sentence_index, part_index, _), wave in zip(chunks, chunk_waves):
+        sentence_parts[sentence_index].setdefault(part_index, []).append(wave)
+    return [
+        np.concatenate([_cross_fade(waves) for waves in parts.values()]) if parts else np.array([])
+        for parts in sentence_parts
+    ], target_sample_rate
+
+
 def audio_and_sample_rate_for_setence(sentence: str, voice: str = DEFAULT_SPEAKER) -> (np.array, float):
     model, vocoder = _get_model_and_vocoder()
     audio_segments, sample_rate = _generate_audio_segments(sentence, voice, model, vocoder)
@@ -141,9 +361,65 @@ def audio_and_sample_rate_for_setence(sentence: str, voice: str = DEFAULT_SPEAKE
     else:
         return np.array([]), sample_rate
 
+def benchmark(
+    profile_names: list[str],
+    sentences: list[str] = BENCHMARK_SENTENCES,
+    thread_counts: list[int] | None = None,
+):
+    """Prints the real-time factor (synthesis time / audio time) per profile.
+
+    With `thread_counts` every profile is measured once per intra-op thread
+    count instead of with its own setting. Inter-op threads are fixed once
+    torch starts, compare those across runs via LATE_NOW_TTS_PROFILE instead.
+    """
+    results = []
+    for profile_name in profile_names:
+        profile = INFERENCE_PROFILES[profile_name]
+        for num_threads in thread_counts or [profile.num_threads]:
+            # Swapped in under the same name so the cached model is reused
+            INFERENCE_PROFILES[profile_name] = replace(profile, num_threads=num_threads)
+            try:
+                # Model loading and the first pass are not part of the measurement
+                audio_for_sentences(sentences[:1], profile_name=profile_name)
+
+                start = time.perf_counter()
+                waves, sample_rate = audio_for_sentences(sentences, profile_name=profile_name)
+                elapsed_sec = time.perf_counter() - start
+            finally:
+                INFERENCE_PROFILES[profile_name] = profile
+            audio_sec = sum(len(wave) for wave in waves) / sample_rate
+            results.append((profile_name, num_threads or torch.get_num_threads(), elapsed_sec, audio_sec))
+
+    print(f"{'profile':<12} {'threads':>7} {'synth':>9} {'audio':>9} {'RTF':>7}")
+    for profile_name, num_threads, elapsed_sec, audio_sec in results:
+        print(
+            f"{profile_name:<12} {num_threads:>7} {elapsed_sec:8.2f}s {audio_sec:8.2f}s {elapsed_sec / audio_sec:7.3f}"
+        )
+
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", default=INFERENCE_PROFILE, choices=list(INFERENCE_PROFILES))
+    parser.add_argument(
+        "--benchmark",
+        nargs="*",
+        choices=list(INFERENCE_PROFILES),
+        help="Report the real-time factor of these profiles (all when empty)",
+    )
+    parser.add_argument(
+        "--threads",
+        nargs="+",
+        type=int,
+        help="With --benchmark, measure each profile at these intra-op thread counts",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark is not None:
+        benchmark(args.benchmark or list(INFERENCE_PROFILES), thread_counts=args.threads)
+        return
+
     gen_text = "testing testing"
-    final_wave, sample_rate = audio_and_sample_rate_for_setence(gen_text)
+    (final_wave,), sample_rate = audio_for_sentences([gen_text], profile_name=args.profile)
     output_file = os.path.join("./", "test.wav")
     sf.write(output_file, final_wave, sample_rate)  # Assuming a sample rate of 24000 Hz
     print(f"Audio saved to {output_file}")
@@ -152,4 +428,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -1,11 +1,19 @@
 from late_now.plan_broadcast._types import ShowSegment, ResourceStagingArea
 from diffusers import DiffusionPipeline
+import hashlib
+import os
 import torch
 from functools import cache
-from late_now.llm_util import prompt_general_llm
+from late_now.llm_util import (
+    aprompt_general_llm,
+    prompt_general_llm,
+    release_local_model,
+)
 
 # Can be set to 1~50 steps. LCM support fast inference even <= 4 steps. Recommend: 1~8 steps.
 NUM_INFERENCE_STEPS = 8
+# "diffusers" runs LCM Dreamshaper, "stub" paints a flat color derived from the prompt
+IMAGE_BACKEND = os.environ.get("LATE_NOW_IMAGE_BACKEND", "diffusers")
 
 
 @cache
@@ -16,6 +24,13 @@ def _get_model_pipe():
     return pipe
 
 
+def _stub_image(image_prompt: str):
+    from PIL import Image
+
+    digest = hashlib.sha256(image_prompt.encode("utf-8")).digest()
+    return Image.new("RGB", (512, 512), tuple(digest[:3]))
+
+
 def _image_prompt_from_source_material(source_material: str) -> str:
     return f"""
     Given the following source material, generate a description of an image which 
@@ -24,21 +39,39 @@ def _image_prompt_from_source_material(source_material: str) -> str:
     Source Material: {source_material}"""
 
 
-def image_for_segment(segment: ShowSegment, staging_area: ResourceStagingArea):
-    pipe = _get_model_pipe()
-    llm_prompt_for_image_prompt = _image_prompt_from_source_material(
-        segment.source_material
+def image_prompt_for_segment(segment: ShowSegment) -> str:
+    return prompt_general_llm(
+        _image_prompt_from_source_material(segment.source_material)
+    )
+
+
+async def aimage_prompt_for_segment(segment: ShowSegment) -> str:
+    return await aprompt_general_llm(
+        _image_prompt_from_source_material(segment.source_material)
     )
-    image_prompt = prompt_general_llm(llm_prompt_for_image_prompt)
+
+
+def image_for_segment(
+    segment: ShowSegment,
+    staging_area: ResourceStagingArea,
+    image_prompt: str | None = None,
+):
+    if image_prompt is None:
+        image_prompt = image_prompt_for_segment(segment)
     image_prompt = (
         f"vibrant, Hilarious, cartoonish, funny image of {image_prompt!r}, 8k"
     )
-    images = pipe(
-        prompt=image_prompt,
-        num_inference_steps=NUM_INFERENCE_STEPS,
-        guidance_scale=0,
-        lcm_origin_steps=50,
-    ).images
+    if IMAGE_BACKEND == "stub":
+        image = _stub_image(image_prompt)
+    else:
+        release_local_model()
+        pipe = _get_model_pipe()
+        image = pipe(
+            prompt=image_prompt,
+            num_inference_steps=NUM_INFERENCE_STEPS,
+            guidance_scale=0,
+            lcm_origin_steps=50,
+        ).images[0]
     image_path = staging_area.image_path(ext="png")
-    images[0].save(image_path)
+    image.save(image_path)
     return image_path
@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+
+
+class ResourceTag(Enum):
+    # In-process torch models (F5-TTS, diffusers, local LLM); one at a time.
+    GPU = "gpu"
+    # AniPortrait/MoMask CLI runs. Mostly process start-up and CPU-side work with
+    # small models, so they overlap the GPU pool but never each other.
+    ANIMATION = "animation"
+    CPU = "cpu"
+    NETWORK = "network"
+
+
+DEFAULT_RESOURCE_LIMITS = {
+    ResourceTag.GPU: 1,
+    ResourceTag.ANIMATION: 1,
+    ResourceTag.CPU: os.cpu_count() or 1,
+    ResourceTag.NETWORK: 8,
+}
+
+
+class StageScheduler:
+    """Runs packaging stages as soon as their dependencies finish.
+
+    Every resource tag gets its own thread pool sized by its limit, so GPU
+    stages are serialized while CPU and network stages run alongside them.
+    Stages sharing a tag start in the order they become ready.
+    """
+
+    def __init__(self, resource_limits: dict[ResourceTag, int] | None = None):
+        limits = {**DEFAULT_RESOURCE_LIMITS, **(resource_limits or {})}
+        self._executors = {
+            tag: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=tag.value)
+            for tag, limit in limits.items()
+        }
+        self._timings_lock = threading.Lock()
+        self.timings: list[tuple[str, ResourceTag, float]] = []
+
+    def submit(
+        self, name: str, tag: ResourceTag, fn, *, deps: tuple[Future, ...] = ()
+    ) -> Future:
+        """Schedules `fn(*dep_results)` on the `tag` pool once `deps` resolve."""
+        result = Future()
+        pending = [len(deps)]
+        pending_lock = threading.Lock()
+
+        def _run():
+            start = time.monotonic()
+            try:
+                value = fn(*(dep.result() for dep in deps))
+            except BaseException as e:
+                result.set_exception(e)
+                return
+            with self._timings_lock:
+                self.timings.append((name, tag, time.monotonic() - start))
+            result.set_result(value)
+
+        def _on_dep_done(dep: Future):
+            with pending_lock:
+                if pending[0] <= 0:
+                    return
+                if dep.exception() is not None:
+                    # Fail fast on the first broken dependency.
+                    pending[0] = -1
+                    result.set_exception(dep.exception())
+                    return
+                pending[0] -= 1
+                ready = pending[0] == 0
+            if ready:
+                self._executors[tag].submit(_run)
+
+        if not deps:
+            self._executors[tag].submit(_run)
+        for dep in deps:
+            dep.add_done_callback(_on_dep_done)
+        return result
+
+    def shutdown(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+
+    def print_timings(self):
+        for name, tag, duration_sec in self.timings:
+            print(f"{name:<40} {tag.value:<12} {duration_sec:8.2f}s")
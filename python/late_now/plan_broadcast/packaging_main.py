@@ -7,7 +7,10 @@ from late_now.plan_broadcast._types import (
     ShowSegment,
     ResourceStagingArea,
 )
-from late_now.plan_broadcast.packaging import package_segment
+from late_now.plan_broadcast.packaging import (
+    package_segments,
+    package_segments_sequentially,
+)
 from late_now.plan_broadcast.broadcast_definition import (
     create_broadcast_definition_bundle,
 )
@@ -27,9 +30,12 @@ def packaging(args):
     # Convert back to ShowSegment objects
     show_structure = [ShowSegment.from_dict(segment) for segment in show_structure_data]
     with _resource_staging_area() as staging_area:
-        packaged_segments = [
-            package_segment(segment, staging_area) for segment in show_structure
-        ]
+        if args.sequential:
+            packaged_segments = package_segments_sequentially(
+                show_structure, staging_area
+            )
+        else:
+            packaged_segments = package_segments(show_structure, staging_area)
         create_broadcast_definition_bundle(
             packaged_segments, staging_area, args.output_tar_path
         )
@@ -49,6 +55,11 @@ def _parse_args():
         required=True,
         help="Path to the output tar file",
     )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Package segments one stage at a time instead of overlapping stages",
+    )
     return parser.parse_args()
 
 
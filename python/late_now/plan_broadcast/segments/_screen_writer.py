@@ -5,7 +5,7 @@ from late_now.plan_broadcast._types import (
     SegmentScriptLine,
     SequenceType,
 )
-from late_now.llm_util import prompt_screenwriter
+from late_now.llm_util import aprompt_screenwriter, prompt_screenwriter
 import json
 
 SOUND_EFFECTS = {
@@ -118,6 +118,25 @@ def segment_from_walter_content(
     )
 
 
+async def asegment_from_walter_content(
+    *,
+    source_material: str,
+    walter_generated_content: str,
+) -> ShowSegment:
+    script_raw = await aprompt_screenwriter(
+        walter_generated_content,
+        screenwriter_system_prompt=SCREENWRITER_SYSTEM_PROMPT.format(
+            input_description="...freeform plain text from the host..."
+        ),
+    )
+    detailed_script = _create_detailed_script(script_raw)
+    return ShowSegment(
+        sequence_type=SequenceType.BROADCAST,
+        source_material=source_material.to_dict(),
+        detailed_script=detailed_script,
+    )
+
+
 def segment_from_rough_script(rough_script: str) -> ShowSegment:
     script_raw = prompt_screenwriter(
         rough_script,
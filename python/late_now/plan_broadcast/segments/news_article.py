@@ -1,9 +1,13 @@
 from dataclasses import dataclass
 from late_now.llm_util import (
+    aprompt_walter,
     prompt_walter,
 )
 from late_now.plan_broadcast._types import ShowSegment
-from late_now.plan_broadcast.segments._screen_writer import segment_from_walter_content
+from late_now.plan_broadcast.segments._screen_writer import (
+    asegment_from_walter_content,
+    segment_from_walter_content,
+)
 from late_now.plan_broadcast._content_queue import NewsArticle
 
 
@@ -39,3 +43,14 @@ def produce_segment_from_news_input(
         source_material=segment_input.article,
         walter_generated_content=response,
     )
+
+
+async def aproduce_segment_from_news_input(
+    segment_input: NewsArticleSegmentInput,
+) -> ShowSegment:
+    prompt = _single_news_article_segment_prompt(segment_input.article)
+    response = await aprompt_walter(prompt, temperature=1.15)
+    return await asegment_from_walter_content(
+        source_material=segment_input.article,
+        walter_generated_content=response,
+    )
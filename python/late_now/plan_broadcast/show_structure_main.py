@@ -1,7 +1,9 @@
 import json
 import argparse
+import asyncio
 from typing import List
 
+from late_now.llm_util import aclose_llm_sessions
 from late_now.plan_broadcast._types import ShowSegment
 from late_now.plan_broadcast.segments import (
     news_article,
@@ -10,23 +12,55 @@ from late_now.plan_broadcast.segments import (
 )
 
 
-def _segments_from_news_articles(article_links: List[str]) -> List[ShowSegment]:
+async def _aplan_articles(articles, max_workers: int) -> List[ShowSegment | None]:
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def _plan_isolated(article) -> ShowSegment | None:
+        if article is None:
+            return None
+        async with semaphore:
+            try:
+                return await news_article.aproduce_segment_from_news_input(
+                    news_article.NewsArticleSegmentInput(article)
+                )
+            except Exception as e:
+                print(f"Error planning segment for {article.title!r}: {e}")
+                return None
+
+    try:
+        return await asyncio.gather(*(_plan_isolated(article) for article in articles))
+    finally:
+        await aclose_llm_sessions()
+
+
+def _segments_from_news_articles(
+    article_links: List[str], max_articles: int = 1, max_workers: int = 4
+) -> List[ShowSegment]:
     content_queue = ContentQueue(article_links=article_links)
-    show_structure = []
-    for article_text in content_queue.consume_news_articles(1):
-        print(article_text)
-        show_structure.append(
-            news_article.produce_segment_from_news_input(
-                news_article.NewsArticleSegmentInput(article_text)
-            )
-        )
+    articles = content_queue.consume_news_articles_concurrently(
+        max_articles, max_workers=max_workers
+    )
+    for article in articles:
+        print(article)
+
+    # Segments come back in input order; failed links are dropped individually.
+    segments = asyncio.run(_aplan_articles(articles, max_workers))
+    show_structure = [segment for segment in segments if segment is not None]
+    if not show_structure:
+        raise RuntimeError("Failed to plan a segment from any of the article links")
     return show_structure
 
 
 def create_show_structure(args):
     show_structure = []
     if args.article_links:
-        show_structure.extend(_segments_from_news_articles(args.article_links))
+        show_structure.extend(
+            _segments_from_news_articles(
+                args.article_links,
+                max_articles=args.max_articles,
+                max_workers=args.planning_workers,
+            )
+        )
     if args.rough_script_path:
         with open(args.rough_script_path, "r") as script_file:
             rough_script = script_file.read()
@@ -45,6 +79,18 @@ def _parse_args():
         nargs="+",
         help="Links to articles to include in the broadcast",
     )
+    parser.add_argument(
+        "--max-articles",
+        type=int,
+        default=1,
+        help="Maximum number of article links to turn into segments",
+    )
+    parser.add_argument(
+        "--planning-workers",
+        type=int,
+        default=4,
+        help="Number of articles scraped and planned concurrently",
+    )
     parser.add_argument(
         "--rough-script-path",
         type=str,
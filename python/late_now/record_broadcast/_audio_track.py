@@ -1,16 +1,30 @@
+import multiprocessing
 import os
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
 from ._types import (
     RecordBroadcastContext,
     Track,
 )
 from PIL import Image, ImageDraw, ImageFont
 import pysrt
-import whisper
-from whisper.utils import WriteSRT
 from late_now.record_broadcast._ffmpeg_util import (
     probe_length_in_seconds,
-    combine_frames_into_gif,
+    combine_stills_into_video,
+)
+
+# "plan" times subtitles from the speech timings the packager recorded for each
+# sentence, "whisper" re-transcribes the concatenated audio. Bundles without
+# speech timings always use Whisper.
+SUBTITLE_TIMING = os.environ.get("LATE_NOW_SUBTITLE_TIMING", "plan")
+
+WHISPER_MODEL_NAME = "base"
+# Transcribe each sequence's audio in its own process and stitch the results,
+# instead of one serial pass over the whole show.
+WHISPER_CHUNKED = os.environ.get("LATE_NOW_WHISPER_CHUNKED", "1") == "1"
+WHISPER_MAX_WORKERS = int(
+    os.environ.get("LATE_NOW_WHISPER_MAX_WORKERS", max(1, (os.cpu_count() or 1) // 4))
 )
 
 
@@ -60,16 +74,107 @@ def parse_srt(file_path):
     return [(sub.start.to_time(), sub.end.to_time(), sub.text) for sub in subs]
 
 
+@cache
+def _get_whisper_model():
+    # Imported lazily, Whisper is only needed for the fallback timing mode.
+    import whisper
+
+    return whisper.load_model(WHISPER_MODEL_NAME)
+
+
+def _init_transcription_worker(num_threads: int):
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def _transcribe_chunk(audio_path: str, initial_prompt: str | None) -> dict:
+    return _get_whisper_model().transcribe(
+        audio_path,
+        initial_prompt=initial_prompt,
+        word_timestamps=True,
+    )
+
+
+def _offset_transcription(result: dict, offset_sec: float) -> list[dict]:
+    segments = []
+    for segment in result["segments"]:
+        segment = {
+            **segment,
+            "start": segment["start"] + offset_sec,
+            "end": segment["end"] + offset_sec,
+        }
+        if "words" in segment:
+            segment["words"] = [
+                {
+                    **word,
+                    "start": word["start"] + offset_sec,
+                    "end": word["end"] + offset_sec,
+                }
+                for word in segment["words"]
+            ]
+        segments.append(segment)
+    return segments
+
+
+def _transcribe_sequences_in_chunks(context: RecordBroadcastContext) -> dict:
+    """Transcribes every sequence's audio in parallel, on the full track timeline.
+
+    The sequence audio files are exactly the pieces the audio track concatenates,
+    so each chunk's timestamps only need shifting by the sequences before it.
+    """
+    sequences = context.broadcast_definition()["sequences"]
+    chunks = []
+    offset_sec = 0.0
+    for sequence in sequences:
+        chunks.append(
+            (
+                os.path.join(
+                    context.broadcast_directory(), sequence["parameters"]["audio"]
+                ),
+                sequence["parameters"].get("full_text_transcript"),
+                offset_sec,
+            )
+        )
+        offset_sec += sequence["duration_sec"]
+
+    num_workers = max(1, min(WHISPER_MAX_WORKERS, len(chunks)))
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        # Fresh interpreters, forking a process with torch threads can deadlock.
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_transcription_worker,
+        initargs=(max(1, (os.cpu_count() or 1) // num_workers),),
+    ) as executor:
+        results = list(
+            executor.map(
+                _transcribe_chunk,
+                [audio_path for audio_path, _, _ in chunks],
+                [initial_prompt for _, initial_prompt, _ in chunks],
+            )
+        )
+
+    segments = []
+    for result, (_, _, offset_sec) in zip(results, chunks):
+        segments.extend(_offset_transcription(result, offset_sec))
+    for i, segment in enumerate(segments):
+        segment["id"] = i
+    return {
+        "text": "".join(result["text"] for result in results),
+        "segments": segments,
+        "language": results[0]["language"] if results else None,
+    }
+
+
 def _get_srt_data_from_track(
     context: RecordBroadcastContext, audio_track: Track, full_text_transcript: str
 ) -> str:
-    whisper.load_model("base")
-    model = whisper.load_model("base")
-    result = model.transcribe(
-        audio_track.absolute_path,
-        initial_prompt=full_text_transcript,
-        word_timestamps=True,
-    )
+    from whisper.utils import WriteSRT
+
+    if WHISPER_CHUNKED and len(context.broadcast_definition()["sequences"]) > 1:
+        result = _transcribe_sequences_in_chunks(context)
+    else:
+        result = _transcribe_chunk(audio_track.absolute_path, full_text_transcript)
 
     subtitles_dir = os.path.join(context.track_storage_path(), "subtitles")
     os.makedirs(subtitles_dir, exist_ok=True)
@@ -92,6 +197,84 @@ def _get_srt_data_from_track(
     return os.path.join(subtitles_dir, new_file)
 
 
+# Same layout Whisper's SRT writer produced: one line of at most this many
+# characters, shown once per word with that word highlighted.
+MAX_CAPTION_LINE_WIDTH = 16
+
+
+def _caption_lines(words: list[str]) -> list[list[str]]:
+    lines = [[]]
+    line_length = 0
+    for word in words:
+        if lines[-1] and line_length + 1 + len(word) > MAX_CAPTION_LINE_WIDTH:
+            lines.append([])
+            line_length = 0
+        line_length += len(word) + (1 if lines[-1] else 0)
+        lines[-1].append(word)
+    return lines
+
+
+def _captions_for_sentence(
+    sentence: str, start_sec: float, duration_sec: float
+) -> list[tuple[float, float, str]]:
+    words = sentence.split()
+    if not words:
+        return []
+
+    # Each word is on screen for a share of the sentence proportional to its
+    # length, counting the space after it.
+    sec_per_char = duration_sec / sum(len(word) + 1 for word in words)
+    captions = []
+    word_start_sec = start_sec
+    for line in _caption_lines(words):
+        for i, word in enumerate(line):
+            word_end_sec = word_start_sec + (len(word) + 1) * sec_per_char
+            text = " ".join(
+                f"<u>{other}</u>" if j == i else other for j, other in enumerate(line)
+            )
+            captions.append((word_start_sec, word_end_sec, text))
+            word_start_sec = word_end_sec
+    return captions
+
+
+def _captions_from_speech_timings(
+    broadcast_definition: dict,
+) -> list[tuple[float, float, str]] | None:
+    """Captions from the packaged speech timings, None if the bundle lacks them."""
+    captions = []
+    sequence_start_sec = 0.0
+    for sequence in broadcast_definition["sequences"]:
+        parameters = sequence["parameters"]
+        if sequence["type"] == "broadcast":
+            if "speech_timings" not in parameters:
+                return None
+            for timing in parameters["speech_timings"]:
+                captions.extend(
+                    _captions_for_sentence(
+                        timing["sentence"],
+                        sequence_start_sec + timing["start_sec"],
+                        timing["duration_sec"],
+                    )
+                )
+        # Sequence audio is concatenated back to back into the audio track.
+        sequence_start_sec += sequence["duration_sec"]
+    return captions
+
+
+def _captions_from_whisper(
+    context: RecordBroadcastContext, audio_track: Track, full_text_transcript: str
+) -> list[tuple[float, float, str]]:
+    srt_file_path = _get_srt_data_from_track(context, audio_track, full_text_transcript)
+    return [
+        (
+            _time_to_milliseconds(start) / 1000,
+            _time_to_milliseconds(end) / 1000,
+            text,
+        )
+        for start, end, text in parse_srt(srt_file_path)
+    ]
+
+
 SCREEN_WIDTH = 376
 SCREEN_HEIGHT = 812
 HIGHLIGHT_COLOR = (255, 0, 0, 255)
@@ -104,6 +287,12 @@ WORD_SPACE = 10
 FPS = 30
 
 
+@cache
+def _word_width(font, word: str) -> int:
+    bbox = font.getbbox(word)
+    return bbox[2] - bbox[0]
+
+
 def _render_text_frame(text, output_path: str):
     image = Image.new("RGBA", (SCREEN_WIDTH, SCREEN_HEIGHT), (0, 255, 0, 0))
     draw = ImageDraw.Draw(image)
@@ -120,12 +309,8 @@ def _render_text_frame(text, output_path: str):
         else:
             draw.text((current_position, SUBTITLE_Y), word, fill="white", font=FONT)
 
-        # Use textbbox to get the word's width
-        bbox = draw.textbbox((0, 0), word, font=FONT)
-        word_width = bbox[2] - bbox[0]  # Calculate width from the bounding box
-
         # Move to the next word's position
-        current_position += word_width + WORD_SPACE
+        current_position += _word_width(FONT, word) + WORD_SPACE
 
     # Save the resulting image
     image.save(output_path)
@@ -138,38 +323,49 @@ def _time_to_milliseconds(time_obj):
     ) * 1000 + time_obj.microsecond // 1000
 
 
-def _subtitle_track_from_audio_track(
+def _subtitle_track_from_captions(
     context: RecordBroadcastContext,
-    audio_track: Track,
-    full_text_transcript: str,
+    captions: list[tuple[float, float, str]],
 ) -> Track:
-    srt_file_path = _get_srt_data_from_track(context, audio_track, full_text_transcript)
-    srt_file_data = parse_srt(srt_file_path)
-
-    frame_number = 0
-
     sub_overlay_dir = os.path.join(context.track_storage_path(), "subtitle_overlay")
     os.makedirs(sub_overlay_dir, exist_ok=True)
 
-    for start, end, text in srt_file_data:
-        # Convert start and end time to milliseconds
-        start_ms = _time_to_milliseconds(start)
-        end_ms = _time_to_milliseconds(end)
-
-        # Calculate duration in milliseconds
-        duration_ms = end_ms - start_ms
-
-        # Calculate number of frames for this subtitle (duration in ms converted to frames)
-        num_frames = int((duration_ms / 1000) * FPS)
+    # Every distinct caption state is rendered once and then shown for as long
+    # as it lasts, blank in between captions.
+    caption_to_image_path = {}
 
-        for _ in range(num_frames):
-            frame_path = os.path.join(sub_overlay_dir, f"frame_{frame_number}.png")
-            _render_text_frame(text, frame_path)
-            frame_number += 1
+    def _image_for_caption(text: str) -> str:
+        if text not in caption_to_image_path:
+            image_path = os.path.join(
+                sub_overlay_dir, f"caption_{len(caption_to_image_path)}.png"
+            )
+            _render_text_frame(text, image_path)
+            caption_to_image_path[text] = image_path
+        return caption_to_image_path[text]
+
+    image_paths_and_durations = []
+    current_frame = 0
+    for start_sec, end_sec, text in captions:
+        # Snap to frames so rounding never accumulates over a long show
+        start_frame = round(start_sec * FPS)
+        end_frame = round(end_sec * FPS)
+
+        if start_frame > current_frame:
+            image_paths_and_durations.append(
+                (_image_for_caption(""), (start_frame - current_frame) / FPS)
+            )
+            current_frame = start_frame
+        if end_frame > current_frame:
+            image_paths_and_durations.append(
+                (_image_for_caption(text), (end_frame - current_frame) / FPS)
+            )
+            current_frame = end_frame
 
-    overlay_output = os.path.join(sub_overlay_dir, "subtitles.gif")
+    if not image_paths_and_durations:
+        image_paths_and_durations.append((_image_for_caption(""), 1 / FPS))
 
-    combine_frames_into_gif(sub_overlay_dir, overlay_output)
+    overlay_output = os.path.join(sub_overlay_dir, "subtitles.webm")
+    combine_stills_into_video(image_paths_and_durations, overlay_output, FPS)
     return Track(overlay_output, "video", probe_length_in_seconds(overlay_output))
 
 
@@ -183,7 +379,13 @@ def record_audio_track(context: RecordBroadcastContext) -> tuple[Track, Track]:
 
     audio_track = _concat_audio_tracks(context)
 
-    subtitle_track = _subtitle_track_from_audio_track(
-        context, audio_track, "\n".join(full_text_transcript_parts)
-    )
+    captions = None
+    if SUBTITLE_TIMING != "whisper":
+        captions = _captions_from_speech_timings(context.broadcast_definition())
+    if captions is None:
+        captions = _captions_from_whisper(
+            context, audio_track, "\n".join(full_text_transcript_parts)
+        )
+
+    subtitle_track = _subtitle_track_from_captions(context, captions)
     return audio_track, subtitle_track
@@ -1,5 +1,6 @@
 import os
 import json
+import subprocess
 from ._types import (
     RecordBroadcastContext,
     Track,
@@ -7,6 +8,18 @@ from ._types import (
 from late_now.record_broadcast._ffmpeg_util import probe_length_in_seconds
 from late_now.rendering.main import composite_blender
 
+# "ffmpeg" composites every track in one filter graph, "blender" uses the
+# sequence editor in a second Blender instance.
+COMPOSITOR = os.environ.get("LATE_NOW_COMPOSITOR", "ffmpeg")
+
+# Mirrors the sequence editor setup in rendering/_entrypoint_compositing.py.
+COMPOSITE_WIDTH = 360
+COMPOSITE_HEIGHT = 812
+COMPOSITE_FPS = 30
+TV_OFFSET_X = -76
+TV_OFFSET_Y = 200
+TV_SCALE = 0.23
+
 
 def _write_compositing_plan(
     context: RecordBroadcastContext,
@@ -39,13 +52,75 @@ def _write_compositing_plan(
         json.dump(index_contents, f)
 
 
-def composite_scene(
+def _video_input_args(track: Track) -> list[str]:
+    # ffmpeg's native VP9 decoder drops the alpha plane, libvpx keeps it.
+    decoder = ["-c:v", "libvpx-vp9"] if track.absolute_path.endswith(".webm") else []
+    return [*decoder, "-i", track.absolute_path]
+
+
+def _composite_ffmpeg(
+    scene_track: Track,
+    image_track: Track,
+    audio_track: Track,
+    subtitle_track: Track,
+    output_video_path: str,
+):
+    # Sequence editor transforms are relative to the canvas center with y up, so
+    # an offset of (x, y) moves the strip center right by x and up by y.
+    filter_graph = ";".join(
+        [
+            f"[0:v]crop=w='min(iw,{COMPOSITE_WIDTH})':h='min(ih,{COMPOSITE_HEIGHT})',"
+            f"pad={COMPOSITE_WIDTH}:{COMPOSITE_HEIGHT}:(ow-iw)/2:(oh-ih)/2,"
+            "setsar=1[scene]",
+            f"[1:v]scale=iw*{TV_SCALE}:ih*{TV_SCALE}[tv]",
+            "[scene][tv]overlay="
+            f"x=(main_w-overlay_w)/2+({TV_OFFSET_X}):"
+            f"y=(main_h-overlay_h)/2-({TV_OFFSET_Y})[with_tv]",
+            "[with_tv][2:v]overlay=x=(main_w-overlay_w)/2:y=(main_h-overlay_h)/2,"
+            f"fps={COMPOSITE_FPS},format=yuv420p[out]",
+        ]
+    )
+    command = [
+        "ffmpeg",
+        "-y",
+        *_video_input_args(scene_track),
+        *_video_input_args(image_track),
+        *_video_input_args(subtitle_track),
+        "-i",
+        audio_track.absolute_path,
+        "-filter_complex",
+        filter_graph,
+        "-map",
+        "[out]",
+        "-map",
+        "3:a",
+        "-t",
+        str(scene_track.duration_sec),
+        "-c:v",
+        "libx264",
+        "-crf",
+        "23",
+        "-c:a",
+        "aac",
+        "-b:a",
+        "192k",
+        "-movflags",
+        "+faststart",
+        output_video_path,
+    ]
+    try:
+        subprocess.run(command, check=True, stderr=subprocess.PIPE, text=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"FFmpeg command failed: {e.returncode} - {e.stderr}")
+
+
+def _composite_blender(
     context: RecordBroadcastContext,
     scene_track: Track,
     image_track: Track,
     audio_track: Track,
     subtitle_track: Track,
-) -> Track:
+):
     # create recording output dir if needed
     composite_root = os.path.join(context.track_storage_path(), "compositing")
     # Make dir
@@ -59,6 +134,27 @@ def composite_scene(
         composite_root=composite_root,
         output_video_path=context.options.output_uri,
     )
+
+
+def composite_scene(
+    context: RecordBroadcastContext,
+    scene_track: Track,
+    image_track: Track,
+    audio_track: Track,
+    subtitle_track: Track,
+) -> Track:
+    if COMPOSITOR == "blender":
+        _composite_blender(
+            context, scene_track, image_track, audio_track, subtitle_track
+        )
+    else:
+        _composite_ffmpeg(
+            scene_track,
+            image_track,
+            audio_track,
+            subtitle_track,
+            context.options.output_uri,
+        )
     return Track(
         absolute_path=context.options.output_uri,
         track_type="video",
@@ -1,4 +1,6 @@
+import os
 import subprocess
+import tempfile
 
 
 def probe_length_in_seconds(absolute_path: str) -> float:
@@ -19,30 +21,50 @@ def probe_length_in_seconds(absolute_path: str) -> float:
     return float(result.stdout)
 
 
-def combine_frames_into_gif(
-    frame_directory: str, output_file: str, framerate: int = 30
+def combine_stills_into_video(
+    image_paths_and_durations: list[tuple[str, float]],
+    output_file: str,
+    framerate: int = 30,
 ):
-    if not output_file.lower().endswith(".gif"):
-        output_file += ".gif"
+    """Encodes still images shown for the given durations, keeping transparency.
 
-    command = [
-        "ffmpeg",
-        "-framerate",
-        str(framerate),
-        "-i",
-        f"{frame_directory}/frame_%d.png",
-        "-filter_complex",
-        "[0:v] split [a][b];[a] palettegen=reserve_transparent=on:transparency_color=ffffff [p];[b][p] paletteuse",
-        "-loop",
-        "0",
-        output_file,
-    ]
+    Uses the concat demuxer, so each distinct image is decoded once no matter
+    how long it stays on screen.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        concat_file_path = os.path.join(tmpdir, "input.txt")
+        with open(concat_file_path, "w") as f:
+            for image_path, duration_sec in image_paths_and_durations:
+                f.write(f"file '{image_path}'\n")
+                f.write(f"duration {duration_sec:.6f}\n")
+            # The concat demuxer ignores the last duration unless the final
+            # file is listed once more.
+            f.write(f"file '{image_paths_and_durations[-1][0]}'\n")
 
-    try:
-        result = subprocess.run(command, check=True, stderr=subprocess.PIPE, text=True)
-        print(f"GIF created successfully: {output_file}")
-        print(f"FFmpeg output:\n{result.stderr}")
-    except subprocess.CalledProcessError as e:
-        print(f"FFmpeg command failed with return code: {e.returncode}")
-        print(f"Error output:\n{e.stderr}")
-        raise RuntimeError("FFmpeg command failed. See error output above.")
+        command = [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            concat_file_path,
+            "-r",
+            str(framerate),
+            "-c:v",
+            "libvpx-vp9",
+            "-pix_fmt",
+            "yuva420p",
+            "-auto-alt-ref",
+            "0",
+            output_file,
+        ]
+
+        try:
+            subprocess.run(command, check=True, stderr=subprocess.PIPE, text=True)
+            print(f"Video created successfully: {output_file}")
+        except subprocess.CalledProcessError as e:
+            print(f"FFmpeg command failed with return code: {e.returncode}")
+            print(f"Error output:\n{e.stderr}")
+            raise RuntimeError("FFmpeg command failed. See error output above.")
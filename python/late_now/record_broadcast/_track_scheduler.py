@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+
+
+class TrackResource(Enum):
+    # Scene rendering; shards itself across every core.
+    BLENDER = "blender"
+    # Whisper / subtitle generation.
+    ASR = "asr"
+    FFMPEG = "ffmpeg"
+
+
+DEFAULT_TRACK_RESOURCE_LIMITS = {
+    TrackResource.BLENDER: 1,
+    TrackResource.ASR: 1,
+    TrackResource.FFMPEG: 2,
+}
+
+
+@dataclass(frozen=True)
+class TrackTiming:
+    name: str
+    resource: TrackResource
+    start_sec: float
+    end_sec: float
+
+    @property
+    def duration_sec(self) -> float:
+        return self.end_sec - self.start_sec
+
+
+class TrackScheduler:
+    """Runs independent recording tracks concurrently.
+
+    Every resource gets its own thread pool sized by its limit, callers join on
+    the returned futures before compositing. Start and end times are recorded
+    relative to the scheduler's creation so the critical path is visible.
+    """
+
+    def __init__(self, resource_limits: dict[TrackResource, int] | None = None):
+        limits = {**DEFAULT_TRACK_RESOURCE_LIMITS, **(resource_limits or {})}
+        self._executors = {
+            resource: ThreadPoolExecutor(
+                max_workers=limit, thread_name_prefix=resource.value
+            )
+            for resource, limit in limits.items()
+        }
+        self._origin = time.monotonic()
+        self._timings_lock = threading.Lock()
+        self.timings: list[TrackTiming] = []
+
+    def submit(self, name: str, resource: TrackResource, fn, *args) -> Future:
+        def _run():
+            start_sec = time.monotonic() - self._origin
+            try:
+                return fn(*args)
+            finally:
+                with self._timings_lock:
+                    self.timings.append(
+                        TrackTiming(
+                            name=name,
+                            resource=resource,
+                            start_sec=start_sec,
+                            end_sec=time.monotonic() - self._origin,
+                        )
+                    )
+
+        return self._executors[resource].submit(_run)
+
+    def shutdown(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def print_timings(self):
+        print(f"{'track':<24} {'resource':<10} {'start':>9} {'end':>9} {'took':>9}")
+        for timing in sorted(self.timings, key=lambda timing: timing.start_sec):
+            print(
+                f"{timing.name:<24} {timing.resource.value:<10} "
+                f"{timing.start_sec:8.2f}s {timing.end_sec:8.2f}s "
+                f"{timing.duration_sec:8.2f}s"
+            )
+        if self.timings:
+            total_sec = max(timing.end_sec for timing in self.timings)
+            print(f"{'total':<24} {'':<10} {'':>9} {total_sec:8.2f}s")
@@ -7,6 +7,7 @@ from ._scene_track import record_scene_track
 from ._image_track import record_image_track
 from ._audio_track import record_audio_track
 from ._compositing import composite_scene
+from ._track_scheduler import TrackResource, TrackScheduler
 
 
 def _parse_args():
@@ -34,14 +35,37 @@ def main():
     options = _parse_args()
 
     with new_broadcast_context(options) as context:
-        audio_track, subtitle_track = record_audio_track(context)
-        composite_scene(
-            context,
-            scene_track=record_scene_track(context),
-            image_track=record_image_track(context),
-            audio_track=audio_track,
-            subtitle_track=subtitle_track,
-        )
+        # The tracks only share the extracted bundle, so they record side by side
+        # and join before compositing.
+        scheduler = TrackScheduler()
+        try:
+            audio_future = scheduler.submit(
+                "audio+subtitles", TrackResource.ASR, record_audio_track, context
+            )
+            scene_future = scheduler.submit(
+                "scene", TrackResource.BLENDER, record_scene_track, context
+            )
+            image_future = scheduler.submit(
+                "image", TrackResource.FFMPEG, record_image_track, context
+            )
+
+            audio_track, subtitle_track = audio_future.result()
+            scene_track = scene_future.result()
+            image_track = image_future.result()
+            scheduler.submit(
+                "composite",
+                TrackResource.FFMPEG,
+                lambda: composite_scene(
+                    context,
+                    scene_track=scene_track,
+                    image_track=image_track,
+                    audio_track=audio_track,
+                    subtitle_track=subtitle_track,
+                ),
+            ).result()
+        finally:
+            scheduler.shutdown()
+            scheduler.print_timings()
 
 
 if __name__ == "__main__":
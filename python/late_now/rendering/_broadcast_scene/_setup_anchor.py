@@ -1,6 +1,7 @@
 import bpy
 import os
 import json
+import numpy as np
 from late_now.rendering.constants import STATIC_MESHES
 import tempfile
 from late_now.rendering._blender_util import import_from_blend
@@ -10,30 +11,38 @@ from late_now.rendering._core import Updater, CompositeUpdater
 import sys
 
 
-def _face_updater(anchor, animation_data):
+def _load_blendshape_frames(broadcast_root, blendshape_data) -> np.ndarray:
+    if "blendshape_frames_path" in blendshape_data:
+        return np.load(
+            os.path.join(broadcast_root, blendshape_data["blendshape_frames_path"]),
+            mmap_mode="r",
+        )
+    # Legacy inline format: [{"values": [...]}, ...]
+    return np.array(
+        [frame["values"] for frame in blendshape_data["blendshape_frames"]],
+        dtype=np.float32,
+    )
+
+
+def _face_updater(anchor, animation_data, frames_packed):
     shape_key_name_to_obj = face.load_targets(anchor)
-    frames_packed = animation_data["blendshape_data"]["blendshape_frames"]
     key_name_to_packed_index = animation_data["blendshape_data"][
         "blendshape_name_to_index"
     ]
 
-    def _get_dict_data_for_frame(index):
-        try:
-            packed_frame_data = frames_packed[index]["values"]
-        except IndexError:
-            print(f"Index {index} is out of range for frames_packed")
-            sys.exit(1)
-        return {
-            key_name: packed_frame_data[packed_index]
-            for key_name in key_name_to_packed_index
-            for packed_index in [key_name_to_packed_index[key_name]]
-        }
+    # Weight curves and key block lookups are resolved once for the whole
+    # sequence, so a frame update is one row read plus direct assignments.
+    key_names, weighted = face.weighted_frames(frames_packed, key_name_to_packed_index)
+    column_to_key_block = face.resolve_key_blocks(shape_key_name_to_obj, key_names)
 
     class FaceUpdater(Updater):
         def update(self, frame_index: int):
-            face.set_shape_key_values(
-                shape_key_name_to_obj, _get_dict_data_for_frame(frame_index)
-            )
+            if not 0 <= frame_index < len(weighted):
+                print(f"Index {frame_index} is out of range for frames_packed")
+                sys.exit(1)
+            row = weighted[frame_index].tolist()
+            for column, key_block in column_to_key_block:
+                key_block.value = row[column]
             bpy.context.scene.frame_set(frame_index)
             bpy.context.view_layer.update()
 
@@ -94,6 +103,12 @@ def setup(scene, broadcast_root, params):
     _optimze_anchor(anchor)
 
     return CompositeUpdater(
-        _face_updater(anchor, walter_animation),
+        _face_updater(
+            anchor,
+            walter_animation,
+            _load_blendshape_frames(
+                broadcast_root, walter_animation["blendshape_data"]
+            ),
+        ),
         _rig_updater(anchor, walter_animation),
     )
@@ -1,8 +1,11 @@
+import numpy as np
+
+
 # Allowed keys
 def smooth_interpolation(t, x, lower_x, higher_x, lower_output, higher_output):
-    # print(t, x, lower_x, higher_x, lower_output, higher_output)
+    # Works on scalars and on whole (frames,) columns alike.
     t = (x - lower_x) / (higher_x - lower_x)
-    t = min(1, max(0, t))
+    t = np.clip(t, 0, 1)
     return lower_output + (higher_output - lower_output) * t
 
 
@@ -88,8 +91,8 @@ WEIGHTS = {
     # "mouthClose": lambda x: smooth_interpolation("mouthClose", x, 0.45, 1, 0.0, 0.8),
     "mouthDimpleLeft": lambda x: smooth_interpolation("t", x, 0, 1.0, 0, 2.0),
     "mouthDimpleRight": lambda x: smooth_interpolation("t", x, 0, 1.0, 0, 2.0),
-    "mouthFrownLeft": lambda x: 0.9 + min(x**2, 0.1),
-    "mouthFrownRight": lambda x: 0.9 + min(x**2, 0.1),
+    "mouthFrownLeft": lambda x: 0.9 + np.minimum(x**2, 0.1),
+    "mouthFrownRight": lambda x: 0.9 + np.minimum(x**2, 0.1),
     "mouthFunnel": lambda x: smooth_interpolation("t", x, 0, 1.0, 0, 2.0),
     "mouthLeft": lambda x: smooth_interpolation("t", x, 0, 1.0, 0, 2.0),
     "mouthRight": lambda x: smooth_interpolation("t", x, 0, 1.0, 0, 2.0),
@@ -140,6 +143,39 @@ def weighted_value(key, xi):
         return xi
 
 
+def weighted_frames(
+    frames: np.ndarray, key_name_to_index: dict[str, int]
+) -> tuple[list[str], np.ndarray]:
+    """Applies WEIGHTS to every frame at once.
+
+    `frames` is (num_frames, num_blendshapes), e.g. a memory-mapped .npy. Returns
+    the key names and a (num_frames, len(key_names)) float32 matrix whose
+    columns line up with them.
+    """
+    key_names = list(key_name_to_index)
+    columns = np.asarray(frames, dtype=np.float32)[
+        :, [key_name_to_index[key_name] for key_name in key_names]
+    ]
+    weighted = np.empty_like(columns)
+    for column, key_name in enumerate(key_names):
+        weighted[:, column] = np.broadcast_to(
+            weighted_value(key_name, columns[:, column]), len(columns)
+        )
+    return key_names, weighted
+
+
+def resolve_key_blocks(shape_key_name_to_obj, key_names: list[str]):
+    """Returns [(column, key_block)] for the key names present on the mesh."""
+    column_to_key_block = []
+    for column, key_name in enumerate(key_names):
+        obj = shape_key_name_to_obj.get(key_name)
+        if obj and obj.type == "MESH" and obj.data.shape_keys:
+            key_block = obj.data.shape_keys.key_blocks.get(key_name)
+            if key_block:
+                column_to_key_block.append((column, key_block))
+    return column_to_key_block
+
+
 def _set_shape_key_value(obj, key_name, value):
     if obj.type == "MESH" and obj.data.shape_keys:
         key_block = obj.data.shape_keys.key_blocks.get(key_name)
@@ -1,11 +1,21 @@
 import bpy
 import json
+import numpy as np
 import os
+import shutil
 import sys
+import tempfile
 from functools import cache
 from late_now.rendering.intro import intro_scene
 from late_now.rendering._broadcast_scene import broadcast_scene
-from late_now.rendering.constants import RENDER_FPS, FRAME_TIME_SEC, DEBUG
+from late_now.rendering.constants import (
+    RENDER_FPS,
+    RENDER_WIDTH,
+    RENDER_HEIGHT,
+    FRAME_TIME_SEC,
+    DEBUG,
+    sequence_num_frames,
+)
 
 
 @cache
@@ -26,8 +36,8 @@ _FAST_RENDER = False
 def setup_blender_scene():
     # Basic scene setup
     bpy.context.scene.render.fps = RENDER_FPS
-    bpy.context.scene.render.resolution_x = 376
-    bpy.context.scene.render.resolution_y = 812
+    bpy.context.scene.render.resolution_x = RENDER_WIDTH
+    bpy.context.scene.render.resolution_y = RENDER_HEIGHT
     bpy.context.scene.render.film_transparent = True
 
     # Render engine setup
@@ -119,6 +129,201 @@ class SimpleAnimator:
         return self.frame_index < self.frame_limit
 
 
+_BAKED_OBJECT_CHANNELS = ("location", "rotation_euler", "scale")
+
+
+class SequenceBaker:
+    """Evaluates the updaters of whole sequences up front and bakes F-curves.
+
+    Samples the same properties `SimpleAnimator` keyframes one by one, but keeps
+    them in memory and writes each F-curve in one `keyframe_points.add` +
+    `foreach_set`. Active camera changes become camera-bound timeline markers,
+    so the baked range can be rendered with a single `render(animation=True)`.
+    """
+
+    def __init__(self):
+        self.total_frames = 0
+        # (id_data, data_path, index) -> ([frame, ...], [value, ...])
+        self._samples = {}
+        self._active_camera = None
+
+    def bake_sequence(self, update_frame_fn, frame_limit):
+        for frame_index in range(frame_limit):
+            update_frame_fn(frame_index)
+            self._sample(self.total_frames + frame_index)
+        self.total_frames += frame_limit
+        print(f"Baked {frame_limit} frames ({self.total_frames} total)")
+
+    def _record(self, id_data, data_path, index, frame, value):
+        frames, values = self._samples.setdefault((id_data, data_path, index), ([], []))
+        frames.append(frame)
+        values.append(value)
+
+    def _sample(self, frame):
+        scene = bpy.context.scene
+        for obj in bpy.data.objects:
+            if obj.animation_data:
+                for data_path in _BAKED_OBJECT_CHANNELS:
+                    for index, value in enumerate(getattr(obj, data_path)):
+                        self._record(obj, data_path, index, frame, value)
+
+                if obj.type == "MESH" and obj.data.shape_keys:
+                    shape_keys = obj.data.shape_keys
+                    for key_block in shape_keys.key_blocks:
+                        self._record(
+                            shape_keys,
+                            f'key_blocks["{key_block.name}"].value',
+                            0,
+                            frame,
+                            key_block.value,
+                        )
+
+        if scene.camera is not None and scene.camera != self._active_camera:
+            marker = scene.timeline_markers.new(f"camera_{frame}", frame=frame)
+            marker.camera = scene.camera
+            self._active_camera = scene.camera
+
+    def write_fcurves(self):
+        for (id_data, data_path, index), (frames, values) in self._samples.items():
+            _write_keyframes(
+                _find_or_create_fcurve(id_data, data_path, index),
+                np.asarray(frames, dtype=np.float32),
+                np.asarray(values, dtype=np.float32),
+            )
+        self._samples.clear()
+
+
+def _find_or_create_fcurve(id_data, data_path, index):
+    animation_data = id_data.animation_data or id_data.animation_data_create()
+    if animation_data.action is None:
+        animation_data.action = bpy.data.actions.new(name=f"{id_data.name}Baked")
+    fcurves = animation_data.action.fcurves
+    return fcurves.find(data_path, index=index) or fcurves.new(data_path, index=index)
+
+
+def _write_keyframes(fcurve, frames: np.ndarray, values: np.ndarray):
+    keyframe_points = fcurve.keyframe_points
+    existing_co = np.empty(2 * len(keyframe_points), dtype=np.float32)
+    keyframe_points.foreach_get("co", existing_co)
+
+    keyframe_points.add(len(frames))
+    keyframe_points.foreach_set(
+        "co",
+        np.concatenate([existing_co, np.column_stack([frames, values]).ravel()]),
+    )
+    # Sorts the points and recomputes the handles once for the whole curve.
+    fcurve.update()
+
+
+def _no_progress(event: dict):
+    pass
+
+
+def _targa_to_rgba(data: bytes) -> bytes:
+    """Unpacks an uncompressed 32 bit Targa into top-down raw RGBA bytes."""
+    id_length, image_type, bits_per_pixel, descriptor = (
+        data[0],
+        data[2],
+        data[16],
+        data[17],
+    )
+    if image_type != 2 or bits_per_pixel != 32:
+        raise ValueError(f"Unexpected Targa type {image_type} / {bits_per_pixel} bpp")
+    width = int.from_bytes(data[12:14], "little")
+    height = int.from_bytes(data[14:16], "little")
+
+    pixels = np.frombuffer(
+        data, dtype=np.uint8, count=width * height * 4, offset=18 + id_length
+    ).reshape(height, width, 4)
+    if not descriptor & 0x20:
+        # Bottom-up origin
+        pixels = pixels[::-1]
+    return np.ascontiguousarray(pixels[..., [2, 1, 0, 3]]).tobytes()
+
+
+def bake_and_render(
+    broadcast_root: str,
+    output_dir: str = None,
+    on_progress=_no_progress,
+    frame_start: int = 0,
+    frame_end: int = None,
+    frame_sink=None,
+) -> int:
+    """Bakes every sequence of the broadcast, then renders the range in one job.
+
+    Only frames in [frame_start, frame_end) are rendered, but the whole timeline
+    is always baked since updaters such as camera cuts carry state across frames.
+    Frames go to `frame_sink` (a binary stream, as raw RGBA) when given, otherwise
+    to PNGs in `output_dir`. `on_progress` receives one dict per sequence baked and
+    per frame written. Returns the total number of frames.
+    """
+    baker = SequenceBaker()
+    sequences = _load_broadcast_index(broadcast_root)["sequences"]
+    for sequence_index, sequence in enumerate(sequences):
+        scene_func = SEQUENCE_TYPE_TO_FUNCTION[sequence["type"]]
+        update_frame_fn = scene_func(broadcast_root, sequence["parameters"])
+        baker.bake_sequence(update_frame_fn, sequence_num_frames(sequence))
+        on_progress(
+            {
+                "event": "sequence_baked",
+                "sequence": sequence_index,
+                "num_sequences": len(sequences),
+                "total_frames": baker.total_frames,
+            }
+        )
+    baker.write_fcurves()
+
+    if frame_end is None or frame_end > baker.total_frames:
+        frame_end = baker.total_frames
+
+    scene = bpy.context.scene
+    scene.frame_start = frame_start
+    scene.frame_end = frame_end - 1
+    if frame_start >= frame_end or (frame_sink is None and not output_dir):
+        return baker.total_frames
+
+    scratch_dir = None
+    if frame_sink is not None:
+        # Blender cannot hand out raw pixels from an animation job, so each frame
+        # goes through an uncompressed Targa in a RAM backed scratch directory
+        # and is pushed to the sink (and deleted) as soon as it is written.
+        scratch_dir = tempfile.mkdtemp(
+            dir="/dev/shm" if os.path.isdir("/dev/shm") else None
+        )
+        scene.render.image_settings.file_format = "TARGA_RAW"
+        scene.render.image_settings.color_mode = "RGBA"
+        scene.render.filepath = os.path.join(scratch_dir, "frame_")
+    else:
+        scene.render.image_settings.file_format = "PNG"
+        # Blender appends the zero padded frame number: frame_0000.png, ...
+        scene.render.filepath = os.path.join(output_dir, "frame_")
+
+    def _on_render_write(scene, *args):
+        if frame_sink is not None:
+            frame_path = scene.render.frame_path(frame=scene.frame_current)
+            with open(frame_path, "rb") as f:
+                frame_sink.write(_targa_to_rgba(f.read()))
+            os.remove(frame_path)
+        on_progress(
+            {
+                "event": "frame_rendered",
+                "frame": scene.frame_current,
+                "total_frames": baker.total_frames,
+            }
+        )
+
+    bpy.app.handlers.render_write.append(_on_render_write)
+    try:
+        bpy.ops.render.render(animation=True)
+    finally:
+        bpy.app.handlers.render_write.remove(_on_render_write)
+        if frame_sink is not None:
+            frame_sink.flush()
+        if scratch_dir is not None:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+    return baker.total_frames
+
+
 class AnimationOperator(bpy.types.Operator):
     bl_idname = "wm.animation_operator"
     bl_label = "Animation Operator"
@@ -130,8 +335,14 @@ class AnimationOperator(bpy.types.Operator):
     _total_frames = 0
     broadcast_root = None
     output_dir = None
+    bake = False
 
     def execute(self, context):
+        if self.bake:
+            self._total_frames = bake_and_render(self.broadcast_root, self.output_dir)
+            self._finish()
+            return {"FINISHED"}
+
         wm = context.window_manager
         self._timer = wm.event_timer_add(FRAME_TIME_SEC, window=context.window)
         wm.modal_handler_add(self)
@@ -166,11 +377,14 @@ class AnimationOperator(bpy.types.Operator):
         sequence = self._sequences[self._current_sequence]
         scene_func = SEQUENCE_TYPE_TO_FUNCTION[sequence["type"]]
         update_frame_fn = scene_func(self.broadcast_root, sequence["parameters"])
-        frame_limit = int(sequence["duration_sec"] * RENDER_FPS)
+        frame_limit = sequence_num_frames(sequence)
         self._animator.on_new_sequence(update_frame_fn, frame_limit, self.output_dir)
 
     def finish_animation(self, context):
         self._total_frames += self._animator.frame_index
+        self._finish()
+
+    def _finish(self):
         bpy.context.scene.frame_end = self._total_frames
         if not self.output_dir:
             bpy.context.scene.render.filepath = "//rendered_animation_"
@@ -186,7 +400,7 @@ class AnimationOperator(bpy.types.Operator):
         wm.event_timer_remove(self._timer)
 
 
-def start_scene(broadcast_root: str, output_dir: str = None):
+def start_scene(broadcast_root: str, output_dir: str = None, bake: bool = False):
     if output_dir and not DEBUG:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
@@ -196,6 +410,55 @@ def start_scene(broadcast_root: str, output_dir: str = None):
         raise ValueError(f"Broadcast root does not exist: {broadcast_root!r}")
 
     AnimationOperator.broadcast_root = broadcast_root
+    AnimationOperator.bake = bake
     bpy.utils.register_class(AnimationOperator)
     setup_blender_scene()
     bpy.ops.wm.animation_operator("INVOKE_DEFAULT")
+
+
+def render_headless(
+    broadcast_root: str,
+    output_dir: str = None,
+    progress_fd: int = None,
+    frame_start: int = 0,
+    frame_end: int = None,
+    frame_sink_fd: int = None,
+):
+    """Batch entry point for `blender --background`.
+
+    Builds and bakes every sequence, then renders [frame_start, frame_end) in one
+    animation job without a window manager or modal timer. Frames are streamed as
+    raw RGBA to `frame_sink_fd` when given (e.g. an encoder's stdin), otherwise
+    written as PNGs to `output_dir`. Progress is written as JSON lines to
+    `progress_fd` when given, keeping it apart from Blender's own stdout chatter.
+    """
+    if not os.path.exists(broadcast_root):
+        raise ValueError(f"Broadcast root does not exist: {broadcast_root!r}")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    progress_stream = (
+        os.fdopen(progress_fd, "w", buffering=1) if progress_fd is not None else None
+    )
+    frame_sink = os.fdopen(frame_sink_fd, "wb") if frame_sink_fd is not None else None
+
+    def _report(event: dict):
+        if progress_stream is not None:
+            progress_stream.write(json.dumps(event) + "\n")
+
+    try:
+        setup_blender_scene()
+        total_frames = bake_and_render(
+            broadcast_root,
+            output_dir,
+            on_progress=_report,
+            frame_start=frame_start,
+            frame_end=frame_end,
+            frame_sink=frame_sink,
+        )
+        _report({"event": "done", "total_frames": total_frames})
+    finally:
+        if frame_sink is not None:
+            frame_sink.close()
+        if progress_stream is not None:
+            progress_stream.close()
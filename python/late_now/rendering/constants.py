@@ -1,11 +1,17 @@
 import pkg_resources
 
 RENDER_FPS = 30
+RENDER_WIDTH = 376
+RENDER_HEIGHT = 812
 FRAME_TIME_MS = 1000.0 / RENDER_FPS
 FRAME_TIME_SEC = 1.0 / RENDER_FPS
 DEBUG = False
 
 
+def sequence_num_frames(sequence: dict) -> int:
+    return int(sequence["duration_sec"] * RENDER_FPS)
+
+
 def get_resource_filename(filename):
     return pkg_resources.resource_filename(__name__, filename)
 
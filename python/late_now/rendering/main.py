@@ -1,6 +1,15 @@
+import json
 import subprocess
 import os
 import pkg_resources
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from late_now.rendering.constants import (
+    RENDER_FPS,
+    RENDER_HEIGHT,
+    RENDER_WIDTH,
+    sequence_num_frames,
+)
 
 BLENDER_EXECUTABLE = os.environ.get("BLENDER_EXECUTABLE")
 if not BLENDER_EXECUTABLE:
@@ -12,18 +21,29 @@ late_now_ROOT = os.path.dirname(
 OUTPUT_ROOT = f"{late_now_ROOT}/late_now/rendering/output/"
 BROADCAST_ROOT = pkg_resources.resource_filename(__name__, "assets/broadcasts/main/")
 
+# Rough peak resident memory of one Blender process rendering the broadcast scene,
+# used to bound how many render shards run side by side.
+RENDER_SHARD_MEMORY_BYTES = int(
+    os.environ.get("LATE_NOW_RENDER_SHARD_MEMORY_BYTES", 4 * 1024**3)
+)
+MIN_FRAMES_PER_SHARD = 30
+
 
-def render_blender(broadcast_root: str, output_root: str, show_ui=False):
+def render_blender(
+    broadcast_root: str, output_root: str, show_ui=False, bake: bool = False
+):
     """
     Launch Blender and run the `start_scene` function defined in `blender_script.py`.
 
     :param show_ui: If True, Blender will show its UI; otherwise, it runs in headless mode.
+    :param bake: If True, bake every sequence into F-curves up front and render the
+        whole frame range as one animation job instead of one frame per timer tick.
     """
     script_path = "late_now.rendering._entrypoint"
     # Python expression to modify sys.path, import the script, and call start_scene
     python_expr = (
         f"import sys; sys.path.append('{late_now_ROOT}'); "
-        f"import {script_path}; {script_path}.start_scene('{broadcast_root}', '{output_root}'); "
+        f"import {script_path}; {script_path}.start_scene('{broadcast_root}', '{output_root}', bake={bake}); "
         # f"from late_now.rendering import _setup_blender_ui; _setup_blender_ui.setup_camera_render_view()"
     )
 
@@ -49,6 +69,228 @@ def render_blender(broadcast_root: str, output_root: str, show_ui=False):
         print(f"An error occurred while running Blender: {e}")
 
 
+def _print_render_progress(event: dict):
+    if event["event"] == "frame_rendered":
+        print(f"Rendered frame {event['frame'] + 1}/{event['total_frames']}")
+    elif event["event"] == "sequence_baked":
+        print(f"Baked sequence {event['sequence'] + 1}/{event['num_sequences']}")
+
+
+def render_blender_headless(
+    broadcast_root: str,
+    output_root: str = None,
+    on_progress=_print_render_progress,
+    frame_start: int = 0,
+    frame_end: int = None,
+    num_threads: int = 0,
+    frame_sink_fd: int = None,
+):
+    """
+    Render the broadcast frames with `blender --background`, without a UI or timer.
+
+    Only frames in [frame_start, frame_end) are rendered. They are streamed as raw
+    RGBA to `frame_sink_fd` when given, otherwise written to `output_root` as PNGs
+    named by their global frame number. Progress events (JSON objects with an
+    "event" key) are read from a dedicated pipe and passed to `on_progress` as
+    they arrive.
+
+    :param num_threads: Render threads for Blender, 0 uses every core.
+    """
+    script_path = "late_now.rendering._entrypoint"
+    progress_read_fd, progress_write_fd = os.pipe()
+    python_expr = (
+        f"import sys; sys.path.append('{late_now_ROOT}'); "
+        f"import {script_path}; {script_path}.render_headless({broadcast_root!r}, "
+        f"{output_root!r}, progress_fd={progress_write_fd}, "
+        f"frame_start={frame_start}, frame_end={frame_end}, "
+        f"frame_sink_fd={frame_sink_fd}); "
+    )
+    blender_cmd = [
+        BLENDER_EXECUTABLE,
+        "--background",
+        "--threads",
+        str(num_threads),
+        "--python-exit-code",
+        "1",
+        "--python-expr",
+        python_expr,
+    ]
+
+    print(f"Running Blender with command: {' '.join(blender_cmd)}")
+    try:
+        process = subprocess.Popen(
+            blender_cmd,
+            pass_fds=tuple(
+                fd for fd in (progress_write_fd, frame_sink_fd) if fd is not None
+            ),
+        )
+    finally:
+        os.close(progress_write_fd)
+
+    with os.fdopen(progress_read_fd) as progress_stream:
+        for line in progress_stream:
+            on_progress(json.loads(line))
+
+    if process.wait() != 0:
+        raise RuntimeError(f"Blender render failed with exit code {process.returncode}")
+
+
+def broadcast_num_frames(broadcast_root: str) -> int:
+    with open(os.path.join(broadcast_root, "index.json")) as f:
+        sequences = json.load(f)["sequences"]
+    return sum(sequence_num_frames(sequence) for sequence in sequences)
+
+
+def default_num_render_shards() -> int:
+    """As many shards as both the cores and the available memory allow."""
+    num_cores = os.cpu_count() or 1
+    try:
+        available_bytes = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError):
+        return 1
+    return max(1, min(num_cores, available_bytes // RENDER_SHARD_MEMORY_BYTES))
+
+
+def _frame_ranges(total_frames: int, num_shards: int) -> list[tuple[int, int]]:
+    if total_frames <= 0:
+        return []
+    num_shards = max(1, min(num_shards, total_frames // MIN_FRAMES_PER_SHARD))
+    bounds = [total_frames * shard // num_shards for shard in range(num_shards + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _render_shard_to_video(
+    broadcast_root: str,
+    shard_video_path: str,
+    encoder_args: list[str],
+    **render_kwargs,
+):
+    """Streams one Blender render straight into an ffmpeg encoder's stdin."""
+    frame_read_fd, frame_write_fd = os.pipe()
+    try:
+        encoder = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                "rgba",
+                "-s",
+                f"{RENDER_WIDTH}x{RENDER_HEIGHT}",
+                "-framerate",
+                str(RENDER_FPS),
+                "-i",
+                "pipe:0",
+                *encoder_args,
+                shard_video_path,
+            ],
+            stdin=frame_read_fd,
+        )
+    finally:
+        os.close(frame_read_fd)
+
+    try:
+        render_blender_headless(
+            broadcast_root, frame_sink_fd=frame_write_fd, **render_kwargs
+        )
+    finally:
+        # Blender has exited, closing the last write end lets the encoder finish.
+        os.close(frame_write_fd)
+        encoder.wait()
+    if encoder.returncode != 0:
+        raise RuntimeError(f"FFmpeg encoder failed with exit code {encoder.returncode}")
+
+
+def _concat_videos(video_paths: list[str], output_path: str):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt") as concat_file:
+        for video_path in video_paths:
+            concat_file.write(f"file '{video_path}'\n")
+        concat_file.flush()
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                concat_file.name,
+                "-c",
+                "copy",
+                output_path,
+            ],
+            check=True,
+        )
+
+
+def render_blender_sharded(
+    broadcast_root: str,
+    output_video_path: str,
+    encoder_args: list[str],
+    num_shards: int = None,
+    on_progress=_print_render_progress,
+):
+    """
+    Render the broadcast as contiguous frame-range shards in parallel Blender
+    processes and encode it to `output_video_path`.
+
+    Every shard rebuilds and bakes the scene, then renders only its own range,
+    so the result is frame-for-frame what a single process would produce. Frames
+    are piped as raw RGBA into one ffmpeg encoder per shard (`encoder_args` are
+    its output options) and the shard videos are concatenated in order without
+    re-encoding, so no frame ever touches the disk as an image.
+    """
+    if num_shards is None:
+        num_shards = int(
+            os.environ.get("LATE_NOW_RENDER_SHARDS", default_num_render_shards())
+        )
+    total_frames = broadcast_num_frames(broadcast_root)
+    if total_frames <= 0:
+        raise ValueError(f"Broadcast at {broadcast_root} has no frames to render")
+    frame_ranges = _frame_ranges(total_frames, num_shards)
+    threads_per_shard = max(1, (os.cpu_count() or 1) // len(frame_ranges))
+    print(
+        f"Rendering {total_frames} frames in {len(frame_ranges)} shards "
+        f"with {threads_per_shard} threads each"
+    )
+
+    extension = os.path.splitext(output_video_path)[1]
+    with tempfile.TemporaryDirectory(
+        dir=os.path.dirname(os.path.abspath(output_video_path))
+    ) as shard_root:
+        shard_video_paths = [
+            os.path.join(shard_root, f"shard_{shard:02d}{extension}")
+            for shard in range(len(frame_ranges))
+        ]
+
+        def _render_shard(shard: int):
+            frame_start, frame_end = frame_ranges[shard]
+            _render_shard_to_video(
+                broadcast_root,
+                shard_video_paths[shard],
+                encoder_args,
+                on_progress=lambda event: on_progress({**event, "shard": shard}),
+                frame_start=frame_start,
+                frame_end=frame_end,
+                num_threads=threads_per_shard,
+            )
+
+        with ThreadPoolExecutor(max_workers=len(frame_ranges)) as executor:
+            # list() re-raises the first shard failure.
+            list(executor.map(_render_shard, range(len(frame_ranges))))
+
+        if len(shard_video_paths) == 1:
+            os.replace(shard_video_paths[0], output_video_path)
+        else:
+            _concat_videos(shard_video_paths, output_video_path)
+
+
 def composite_blender(composite_root: str, output_video_path: str):
     """
     Launch Blender and run the `start_scene` function defined in `blender_script.py`.
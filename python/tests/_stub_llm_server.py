@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubChatCompletionsServer:
+    """OpenAI-compatible `/chat/completions` endpoint on localhost.
+
+    Every request is recorded and answered with `respond(body)`, which echoes
+    the user prompt by default. `fail_next` queues error responses so retry
+    handling can be exercised.
+    """
+
+    def __init__(self, respond=None, latency_sec: float = 0.0):
+        self.respond = respond or (
+            lambda body: f"echo: {body['messages'][-1]['content']}"
+        )
+        self.latency_sec = latency_sec
+        self.requests: list[dict] = []
+        self.headers: list[dict] = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._failures: list[tuple[int, str | None]] = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def fail_next(self, count: int, status: int = 429, retry_after: str | None = None):
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        body = json.loads(handler.rfile.read(int(handler.headers["Content-Length"])))
+        with self._lock:
+            self.requests.append(body)
+            self.headers.append(dict(handler.headers))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            failure = self._failures.pop(0) if self._failures else None
+        try:
+            time.sleep(self.latency_sec)
+            if failure is not None:
+                status, retry_after = failure
+                payload = json.dumps({"error": {"message": "stub failure"}})
+            else:
+                status, retry_after = 200, None
+                content = self.respond(body)
+                payload = json.dumps(
+                    {
+                        "choices": [{"message": {"content": content}}],
+                        "usage": {"total_tokens": len(content) // 4 + 1},
+                    }
+                )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        encoded = payload.encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(encoded)))
+        if retry_after is not None:
+            handler.send_header("Retry-After", retry_after)
+        handler.end_headers()
+        handler.wfile.write(encoded)
+
+    def __enter__(self):
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                stub._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
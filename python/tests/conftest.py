@@ -0,0 +1,31 @@
+import importlib
+import os
+
+import pytest
+
+from _stub_llm_server import StubChatCompletionsServer
+from late_now.llm_util import _groq_backend
+
+_GROQ_ENV = {
+    "GROQ_API_BASE": None,
+    "GROQ_API_KEY": "test-key",
+    "GROQ_MAX_CONCURRENCY": "2",
+}
+
+
+@pytest.fixture
+def groq_stub():
+    """Reloads the Groq backend so its pooled client targets a local stub."""
+    previous_env = {name: os.environ.get(name) for name in _GROQ_ENV}
+    with StubChatCompletionsServer(latency_sec=0.05) as server:
+        os.environ.update({**_GROQ_ENV, "GROQ_API_BASE": server.base_url})
+        try:
+            importlib.reload(_groq_backend)
+            yield server
+        finally:
+            for name, value in previous_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            importlib.reload(_groq_backend)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+packaging = pytest.importorskip(
+    "late_now.plan_broadcast.packaging",
+    reason="packaging needs the full model stack installed",
+)
+
+from late_now.plan_broadcast.packaging import _audio_generation  # noqa: E402
+
+SAMPLE_RATE = 24_000
+_BANK = {
+    "short.wav": np.linspace(-0.5, 0.5, SAMPLE_RATE // 2, dtype=np.float32),
+    "exact.wav": np.linspace(0.5, -0.5, SAMPLE_RATE, dtype=np.float32),
+    "long.wav": np.linspace(-0.25, 0.25, 3 * SAMPLE_RATE, dtype=np.float32),
+}
+
+
+def _reference_sound_effect_data(sound_effect: str, file_name: str, duration: int):
+    """What _get_sound_effect_data produced before clips were cached."""
+    data = _BANK[file_name].copy()
+    duration_samples = int(duration * SAMPLE_RATE)
+    if len(data) < duration_samples:
+        data = np.tile(data, duration_samples // len(data) + 1)
+    fade = _audio_generation._get_volume_fade_for_sound_effect(
+        sound_effect, duration_samples
+    )
+    return data[:duration_samples] * fade
+
+
+@pytest.fixture
+def sound_bank(monkeypatch):
+    monkeypatch.setattr(_audio_generation, "_get_sound_effect_bank", lambda: _BANK)
+    _audio_generation._get_sound_effect_clip.cache_clear()
+    yield
+    _audio_generation._get_sound_effect_clip.cache_clear()
+
+
+@pytest.mark.parametrize("sound_effect", ["APPLAUSE", "INTRO_MUSIC"])
+@pytest.mark.parametrize("file_name", list(_BANK))
+@pytest.mark.parametrize("duration", [1, 2])
+def test_cached_clip_matches_uncached(sound_bank, sound_effect, file_name, duration):
+    expected = _reference_sound_effect_data(sound_effect, file_name, duration)
+    for _ in range(2):  # the second lookup is served from the cache
+        clip = _audio_generation._get_sound_effect_clip(
+            sound_effect, file_name, int(duration * SAMPLE_RATE)
+        )
+        assert clip.dtype == np.float32
+        assert not clip.flags.writeable
+        np.testing.assert_array_equal(clip, expected)
+
+
+def test_mixer_blocks_match_one_shot_mix():
+    rng = np.random.default_rng(0)
+    clips = [(0, 700), (250, 1200), (1999, 5), (2600, 300)]
+    mixer = _audio_generation._TimelineMixer(SAMPLE_RATE)
+    expected = np.zeros(3000, dtype=np.float32)
+    for start, length in clips:
+        audio = rng.uniform(-1, 1, length).astype(np.float32)
+        mixer.add(start, audio)
+        expected[start : start + length] += audio
+    mixer.extend_to(len(expected))
+
+    mixed = np.concatenate([block.copy() for block in mixer.blocks(block_samples=256)])
+    np.testing.assert_allclose(mixed, np.arctan(expected), rtol=1e-6)
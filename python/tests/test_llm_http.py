@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from late_now.llm_util import _groq_backend
+
+
+def _content(json_response: dict) -> str:
+    return json_response["choices"][0]["message"]["content"]
+
+
+def test_completion_uses_api_base_override(groq_stub):
+    response = _groq_backend.completion("hello", system_prompt="sys", temperature=0.5)
+
+    assert _content(response) == "echo: hello"
+    assert groq_stub.requests[0]["model"] == _groq_backend.MODEL_NAME
+    assert groq_stub.requests[0]["messages"][0] == {"role": "system", "content": "sys"}
+    assert groq_stub.headers[0]["Authorization"] == "Bearer test-key"
+
+
+def test_completion_retries_after_429(groq_stub):
+    groq_stub.fail_next(1, status=429, retry_after="1")
+
+    start = time.monotonic()
+    response = _groq_backend.completion("again", system_prompt="", temperature=1.0)
+
+    assert _content(response) == "echo: again"
+    assert len(groq_stub.requests) == 2
+    assert time.monotonic() - start >= 1.0
+
+
+def test_acompletion_retries_after_429(groq_stub):
+    groq_stub.fail_next(1, status=429, retry_after="0")
+
+    async def _run():
+        try:
+            return await _groq_backend.acompletion(
+                "async", system_prompt="", temperature=1.0
+            )
+        finally:
+            await _groq_backend.aclose()
+
+    assert _content(asyncio.run(_run())) == "echo: async"
+    assert len(groq_stub.requests) == 2
+
+
+def test_acompletion_bounds_requests_in_flight(groq_stub):
+    prompts = [f"prompt {i}" for i in range(6)]
+
+    async def _run():
+        try:
+            return await asyncio.gather(
+                *(
+                    _groq_backend.acompletion(prompt, system_prompt="", temperature=1.0)
+                    for prompt in prompts
+                )
+            )
+        finally:
+            await _groq_backend.aclose()
+
+    responses = asyncio.run(_run())
+
+    assert [_content(response) for response in responses] == [
+        f"echo: {prompt}" for prompt in prompts
+    ]
+    assert groq_stub.max_in_flight == 2
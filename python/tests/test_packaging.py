@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import re
+import tarfile
+
+import pytest
+
+packaging = pytest.importorskip(
+    "late_now.plan_broadcast.packaging",
+    reason="packaging needs the full model stack installed",
+)
+nltk = pytest.importorskip("nltk")
+
+from late_now import llm_util  # noqa: E402
+from late_now.llm_util._response_cache import ResponseCache  # noqa: E402
+from late_now.plan_broadcast import packaging_main  # noqa: E402
+from late_now.plan_broadcast.packaging import (  # noqa: E402
+    _audio_generation,
+    _image_generation,
+)
+from late_now.plan_broadcast.packaging._animation_generation import (  # noqa: E402
+    _blendshapes,
+    _joints,
+)
+
+# Staging files are named by a uuid prefix, see ResourceStagingArea.
+_STAGED_NAME = re.compile(r"(?:audio|image|animation)/[0-9a-f]{8}\.\w+")
+
+
+def _segment(sequence_type: str, lines: list[tuple[str, dict]]) -> dict:
+    return {
+        "sequence_type": sequence_type,
+        "source_material": {"text": f"Source material for {sequence_type}"},
+        "detailed_script": {
+            "lines": [
+                {"line_type": line_type, "content": content}
+                for line_type, content in lines
+            ]
+        },
+    }
+
+
+SHOW_STRUCTURE = [
+    _segment(
+        "INTRO",
+        [
+            ("sound", {"sound_effect": "SILENCE", "duration_seconds": 1}),
+            ("dialog", {"text": "Good evening. Welcome to the show!"}),
+        ],
+    ),
+    _segment(
+        "BROADCAST",
+        [
+            ("dialog", {"text": "Big news tonight.", "body_motion": "waving"}),
+            ("sound", {"sound_effect": "APPLAUSE", "duration_seconds": 2}),
+            ("dialog", {"text": "Thank you. Really, thank you. Sit down."}),
+        ],
+    ),
+    _segment(
+        "BROADCAST",
+        [("dialog", {"text": "And that is the show. Good night!"})],
+    ),
+]
+
+
+@pytest.fixture
+def stub_models(monkeypatch, groq_stub, tmp_path):
+    try:
+        nltk.sent_tokenize("One. Two.")
+    except LookupError:
+        pytest.skip("nltk punkt data is not installed")
+    monkeypatch.setattr(
+        llm_util, "RESPONSE_CACHE", ResponseCache(str(tmp_path / "llm"), 1 << 20)
+    )
+    monkeypatch.setattr(_audio_generation, "TTS_BACKEND", "stub")
+    monkeypatch.setattr(_image_generation, "IMAGE_BACKEND", "stub")
+    monkeypatch.setattr(_blendshapes, "BLENDSHAPE_BACKEND", "stub")
+    monkeypatch.setattr(_joints, "MOTION_BACKEND", "stub")
+
+
+def _package(tmp_path, sequential: bool) -> str:
+    structure_path = tmp_path / "structure.json"
+    structure_path.write_text(json.dumps(SHOW_STRUCTURE))
+    output_tar_path = tmp_path / ("sequential.tar" if sequential else "scheduled.tar")
+    packaging_main.packaging(
+        argparse.Namespace(
+            input_structure_path=str(structure_path),
+            output_tar_path=str(output_tar_path),
+            sequential=sequential,
+        )
+    )
+    return str(output_tar_path)
+
+
+def _canonical_bundle(tar_path: str) -> dict[str, bytes]:
+    """Bundle contents with staging names replaced by their order of reference."""
+    with tarfile.open(tar_path) as tar:
+        files = {
+            os.path.normpath(member.name): tar.extractfile(member).read()
+            for member in tar.getmembers()
+            if member.isfile()
+        }
+
+    def _staged_names(name: str) -> list[str]:
+        return _STAGED_NAME.findall(files[name].decode("utf-8"))
+
+    def _rename(name: str) -> None:
+        directory, ext = name.split("/")[0], os.path.splitext(name)[1]
+        renames[name] = f"{directory}/{len(renames)}{ext}"
+
+    renames = {}
+    pending = ["index.json"]
+    while True:
+        while pending:
+            for name in _staged_names(pending.pop(0)):
+                if name not in renames:
+                    _rename(name)
+                    if name.endswith(".json"):
+                        pending.append(name)
+        # Intro sequences don't reference their staged animation, so walk any
+        # leftover JSON roots too, ordered by their contents sans staged names.
+        unreferenced = sorted(
+            (
+                name
+                for name in files
+                if name.endswith(".json")
+                and name not in renames
+                and name != "index.json"
+            ),
+            key=lambda name: _STAGED_NAME.sub("", files[name].decode("utf-8")),
+        )
+        if not unreferenced:
+            break
+        _rename(unreferenced[0])
+        pending.append(unreferenced[0])
+    assert set(files) == {"index.json", *renames}, "bundle has unreferenced files"
+
+    def _rename_references(content: bytes) -> bytes:
+        return _STAGED_NAME.sub(
+            lambda match: renames[match.group(0)], content.decode("utf-8")
+        ).encode("utf-8")
+
+    return {
+        renames.get(name, name): (
+            _rename_references(content) if name.endswith(".json") else content
+        )
+        for name, content in files.items()
+    }
+
+
+def test_scheduled_packaging_matches_sequential(stub_models, tmp_path):
+    sequential = _canonical_bundle(_package(tmp_path, sequential=True))
+    scheduled = _canonical_bundle(_package(tmp_path, sequential=False))
+
+    assert sorted(scheduled) == sorted(sequential)
+    for name in sequential:
+        assert scheduled[name] == sequential[name], name